@@ -0,0 +1,193 @@
+"""
+MCP 서버 기동 시간 벤치마크
+
+servers/ 아래 각 서버를 컨테이너와 같은 방식(server.py 는 SSE, main.py 는 uvicorn + Streamable HTTP)으로
+새 프로세스에서 실행하고 다음을 측정합니다.
+    - ready_ms: 프로세스 시작부터 첫 list_tools 응답까지 (여러 번 실행한 중앙값)
+    - import_ms: `python -X importtime` 의 top-level import 누적 시간과 가장 느린 import 목록
+startup_budget.json 의 예산을 넘으면 종료 코드 1 을 반환합니다. 예산은 1코어 개발 VM 에서
+5회 중앙값을 세 번 측정한 최댓값의 약 1.25배입니다 (수백 ms 의 회귀를 잡도록). 다른 환경에서는
+다시 측정해 맞추세요.
+list_tools 는 DB 를 사용하지 않으므로 Postgres 없이 실행할 수 있습니다.
+
+실행 (서버 의존성이 설치된 환경에서):
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --server fastapi-mcp-server --runs 10
+    python benchmarks/bench_startup.py --python /path/to/server-venv/bin/python
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+
+ROOT = Path(__file__).resolve().parent.parent
+SERVERS_DIR = ROOT / "servers"
+BUDGET_PATH = Path(__file__).resolve().parent / "startup_budget.json"
+POLL_INTERVAL = 0.02
+
+
+def entry_module(server_dir: Path) -> str:
+    """서버 디렉토리의 진입 모듈 이름 (server.py 또는 main.py)"""
+    for name in ("server", "main"):
+        if (server_dir / f"{name}.py").exists():
+            return name
+    raise FileNotFoundError(f"{server_dir} 에 server.py / main.py 가 없습니다")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def parse_importtime(stderr: str) -> list:
+    """-X importtime 출력에서 top-level import 의 (모듈, 누적 us) 목록"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        # 중첩 import 는 들여쓰기되어 있으므로 top-level(공백 1칸)만 집계
+        if not cumulative_us.strip().isdigit() or name.startswith("  "):
+            continue
+        imports.append((name.strip(), int(cumulative_us)))
+    return imports
+
+
+def measure_imports(server_dir: Path, python: str) -> dict:
+    """진입 모듈을 -X importtime 으로 import 하여 import 통계 측정"""
+    module = entry_module(server_dir)
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=server_dir, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import 실패")
+    imports = parse_importtime(proc.stderr)
+    return {
+        "import_ms": sum(us for _, us in imports) / 1000,
+        "slowest": sorted(imports, key=lambda item: item[1], reverse=True)[:10],
+    }
+
+
+def launch(server_dir: Path, python: str, port: int, stderr) -> tuple:
+    """컨테이너 CMD 와 같은 방식으로 서버 실행. (프로세스, transport, URL)"""
+    env = {**os.environ, "MCP_PORT": str(port)}
+    if entry_module(server_dir) == "main":
+        cmd = [python, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)]
+        transport, url = "http", f"http://127.0.0.1:{port}/mcp"
+    else:
+        cmd = [python, "server.py"]
+        transport, url = "sse", f"http://127.0.0.1:{port}/sse"
+    proc = subprocess.Popen(cmd, cwd=server_dir, env=env, stdout=subprocess.DEVNULL, stderr=stderr)
+    return proc, transport, url
+
+
+async def list_tools(transport: str, url: str) -> int:
+    async with AsyncExitStack() as stack:
+        if transport == "sse":
+            streams = await stack.enter_async_context(sse_client(url))
+        else:
+            streams = await stack.enter_async_context(streamablehttp_client(url=url))
+        session = await stack.enter_async_context(ClientSession(streams[0], streams[1]))
+        await session.initialize()
+        return len((await session.list_tools()).tools)
+
+
+async def measure_ready(server_dir: Path, python: str, port: int, timeout: float) -> dict:
+    """서버를 띄우고 첫 list_tools 가 성공할 때까지 폴링"""
+    stderr = tempfile.TemporaryFile()
+    start = time.perf_counter()
+    proc, transport, url = launch(server_dir, python, port, stderr)
+    try:
+        while True:
+            try:
+                async with asyncio.timeout(max(timeout - (time.perf_counter() - start), 0.1)):
+                    tools = await list_tools(transport, url)
+                return {"ready_ms": (time.perf_counter() - start) * 1000, "tools": tools}
+            except Exception:
+                if proc.poll() is not None:
+                    stderr.seek(0)
+                    output = stderr.read().decode(errors="replace").strip()
+                    raise RuntimeError(output.splitlines()[-1] if output else "서버 프로세스 종료")
+                if time.perf_counter() - start > timeout:
+                    raise TimeoutError(f"{timeout}s 안에 list_tools 응답 없음")
+                await asyncio.sleep(POLL_INTERVAL)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        stderr.close()
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="MCP 서버 기동 시간 벤치마크")
+    parser.add_argument("--server", action="append", help="측정할 서버 디렉토리 이름 (기본: 전체)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--python", default=sys.executable, help="서버 실행에 사용할 파이썬 실행 파일")
+    parser.add_argument("--port", type=int, help="고정 포트 (기본: 실행마다 빈 포트)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="실행당 list_tools 대기 한도(초)")
+    args = parser.parse_args()
+
+    budgets = json.loads(BUDGET_PATH.read_text(encoding="utf-8"))
+    names = args.server or sorted(
+        p.name for p in SERVERS_DIR.iterdir()
+        if (p / "server.py").exists() or (p / "main.py").exists()
+    )
+
+    results = {}
+    over_budget = []
+    for name in names:
+        server_dir = SERVERS_DIR / name
+        try:
+            runs = [
+                await measure_ready(server_dir, args.python, args.port or free_port(), args.timeout)
+                for _ in range(args.runs)
+            ]
+            imports = [measure_imports(server_dir, args.python) for _ in range(args.runs)]
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+            over_budget.append(name)
+            continue
+        ready_ms = statistics.median(r["ready_ms"] for r in runs)
+        import_ms = statistics.median(r["import_ms"] for r in imports)
+        budget = budgets.get(name, {})
+        result = {
+            "ready_ms": round(ready_ms, 1),
+            "import_ms": round(import_ms, 1),
+            "tools": runs[-1]["tools"],
+            "budget": budget,
+            "slowest_imports": [
+                {"module": m, "cumulative_ms": round(us / 1000, 1)} for m, us in imports[-1]["slowest"]
+            ],
+        }
+        if ready_ms > budget.get("ready_ms", float("inf")) or import_ms > budget.get("import_ms", float("inf")):
+            result["over_budget"] = True
+            over_budget.append(name)
+        results[name] = result
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if over_budget:
+        print(f"예산 초과: {', '.join(over_budget)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,183 @@
+"""
+MCP transport 벤치마크 (SSE / Streamable HTTP / stdio)
+
+test-server 의 합성 부하 Tool(bench_payload, bench_cpu, bench_sleep, bench_stream)을
+transport 별로 같은 조건에서 호출하여 다음을 측정합니다. DB 는 사용하지 않습니다.
+    - 호출 지연 (빈 응답 기준 = 프레이밍/왕복 오버헤드)
+    - 응답 크기별 지연 (바이트당 비용)
+    - 동시 세션 처리량 (calls/sec)
+    - 최대 동시 세션 수
+    - progress 알림 수신 간격
+
+실행 예:
+    docker compose up -d test-server                          # SSE  (8000)
+    docker compose --profile bench up -d test-server-http     # HTTP (8004)
+    python benchmarks/bench_transports.py --sse-url http://localhost:8000/sse \\
+        --http-url http://localhost:8004/mcp --stdio
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+TEST_SERVER = Path(__file__).resolve().parent.parent / "servers" / "test-server" / "server.py"
+
+
+async def open_session(stack: AsyncExitStack, transport: str, url: str = None) -> ClientSession:
+    """transport 에 맞는 클라이언트 세션을 열어 stack 에 등록"""
+    if transport == "sse":
+        streams = await stack.enter_async_context(sse_client(url))
+    elif transport == "http":
+        streams = await stack.enter_async_context(streamablehttp_client(url=url))
+    else:
+        params = StdioServerParameters(
+            command=sys.executable,
+            args=[str(TEST_SERVER)],
+            env={**os.environ, "MCP_TRANSPORT": "stdio"},
+        )
+        streams = await stack.enter_async_context(stdio_client(params))
+    session = await stack.enter_async_context(ClientSession(streams[0], streams[1]))
+    await session.initialize()
+    return session
+
+
+def summarize(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.mean(ordered), 3),
+        "p50_ms": round(ordered[len(ordered) // 2], 3),
+        "p95_ms": round(ordered[max(0, int(len(ordered) * 0.95) - 1)], 3),
+    }
+
+
+async def timed_calls(session: ClientSession, tool: str, args: dict, count: int) -> list:
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        await session.call_tool(tool, args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def bench_latency(transport: str, url: str, args) -> dict:
+    """단일 세션 지연: 빈 응답, 응답 크기별, CPU, I/O 지연"""
+    async with AsyncExitStack() as stack:
+        session = await open_session(stack, transport, url)
+        await timed_calls(session, "bench_payload", {"size_bytes": 0}, args.warmup)
+
+        result = {"empty": summarize(await timed_calls(session, "bench_payload", {"size_bytes": 0}, args.calls))}
+        for size in args.sizes:
+            result[f"payload_{size}"] = summarize(
+                await timed_calls(session, "bench_payload", {"size_bytes": size}, max(1, args.calls // 10))
+            )
+        result["cpu"] = summarize(
+            await timed_calls(session, "bench_cpu", {"iterations": args.cpu_iterations}, max(1, args.calls // 10))
+        )
+        result["sleep"] = summarize(
+            await timed_calls(session, "bench_sleep", {"delay_ms": args.sleep_ms}, max(1, args.calls // 10))
+        )
+
+        # progress 알림 수신 간격
+        arrivals = []
+
+        async def on_progress(progress, total, message=None):
+            arrivals.append(time.perf_counter())
+
+        start = time.perf_counter()
+        await session.call_tool(
+            "bench_stream", {"steps": args.stream_steps, "interval_ms": args.stream_interval_ms},
+            progress_callback=on_progress,
+        )
+        gaps = [(b - a) * 1000 for a, b in zip([start] + arrivals, arrivals)]
+        result["stream"] = {
+            "received": len(arrivals),
+            "expected": args.stream_steps,
+            "gap": summarize(gaps) if gaps else None,
+        }
+        return result
+
+
+async def bench_throughput(transport: str, url: str, args) -> dict:
+    """동시 세션 처리량: sessions 개 세션이 각자 calls 번 bench_payload 호출"""
+    async with AsyncExitStack() as stack:
+        sessions = [await open_session(stack, transport, url) for _ in range(args.sessions)]
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            timed_calls(s, "bench_payload", {"size_bytes": args.throughput_size}, args.calls) for s in sessions
+        ])
+        elapsed = time.perf_counter() - start
+        total = args.sessions * args.calls
+        return {"sessions": args.sessions, "calls": total, "calls_per_sec": round(total / elapsed, 1)}
+
+
+async def bench_max_sessions(transport: str, url: str, args) -> dict:
+    """세션을 하나씩 늘려 가며 열 수 있는 최대 동시 세션 수 측정"""
+    opened = 0
+    error = None
+    async with AsyncExitStack() as stack:
+        try:
+            while opened < args.max_sessions:
+                # wait_for 는 별도 태스크에서 실행되어 스택의 cancel scope 가 다른 태스크에서 닫히므로
+                # 같은 태스크 안에서 타임아웃을 건다
+                async with asyncio.timeout(args.session_timeout):
+                    session = await open_session(stack, transport, url)
+                await session.call_tool("bench_payload", {"size_bytes": 0})
+                opened += 1
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+    return {"opened": opened, "limit": args.max_sessions, "stopped_by": error}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="MCP transport 벤치마크")
+    parser.add_argument("--sse-url", help="SSE 엔드포인트 (예: http://localhost:8000/sse)")
+    parser.add_argument("--http-url", help="Streamable HTTP 엔드포인트 (예: http://localhost:8004/mcp)")
+    parser.add_argument("--stdio", action="store_true", help="test-server 를 stdio 로 직접 실행하여 측정")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 65536, 1048576])
+    parser.add_argument("--cpu-iterations", type=int, default=100000)
+    parser.add_argument("--sleep-ms", type=int, default=50)
+    parser.add_argument("--stream-steps", type=int, default=20)
+    parser.add_argument("--stream-interval-ms", type=int, default=10)
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--throughput-size", type=int, default=1024)
+    parser.add_argument("--max-sessions", type=int, default=500)
+    parser.add_argument("--session-timeout", type=float, default=10.0)
+    args = parser.parse_args()
+
+    targets = []
+    if args.sse_url:
+        targets.append(("sse", args.sse_url))
+    if args.http_url:
+        targets.append(("http", args.http_url))
+    if args.stdio:
+        targets.append(("stdio", None))
+    if not targets:
+        parser.error("--sse-url, --http-url, --stdio 중 하나 이상 지정하세요")
+
+    results = {}
+    for transport, url in targets:
+        print(f"측정 중: {transport}", file=sys.stderr)
+        results[transport] = {
+            "latency": await bench_latency(transport, url, args),
+            "throughput": await bench_throughput(transport, url, args),
+            "max_sessions": await bench_max_sessions(transport, url, args),
+        }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,4 @@
+#!/bin/bash
+# 읽기 전용 replica(postgres-replica)가 스트리밍 복제로 접속할 수 있도록 허용
+set -e
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
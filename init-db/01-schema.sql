@@ -1,3 +1,5 @@
+-- 기본 테이블. 이후 추가된 컬럼, 인덱스, 트리거는 03-upgrade.sql 에 있다 (기존 볼륨에도 그대로 적용 가능).
+
 -- 생산 라인
 CREATE TABLE production_lines (
     line_id VARCHAR(20) PRIMARY KEY,
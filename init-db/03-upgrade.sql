@@ -0,0 +1,147 @@
+-- 스키마 추가/변경 (여러 번 실행해도 안전)
+--
+-- 새 볼륨에서는 01-schema.sql, 02-data.sql 다음에 자동으로 실행된다.
+-- 이미 초기화된 postgres_mcp_data 볼륨은 init-db 스크립트를 다시 실행하지 않으므로 직접 적용한다.
+--   docker compose exec -T postgres psql -U mcp -d mes -v ON_ERROR_STOP=1 < init-db/03-upgrade.sql
+-- 서버를 새 버전으로 올리기 전에 적용해야 한다 (새 컬럼, data_version 형식을 서버가 사용).
+
+BEGIN;
+
+-- 생산 실적: OEE 가동 시간, 비동기 적재(write-behind) 중복 방지 키
+ALTER TABLE production_records ADD COLUMN IF NOT EXISTS planned_minutes INTEGER;  -- 계획 가동 시간(분). 미입력 시 OEE 가용률 100% 로 간주
+ALTER TABLE production_records ADD COLUMN IF NOT EXISTS run_minutes INTEGER;      -- 실제 가동 시간(분)
+ALTER TABLE production_records ADD COLUMN IF NOT EXISTS ingest_key VARCHAR(32) UNIQUE;
+
+-- 실적별 검사 내역 조회 / 품질 검사 등록 시 대상 실적 조회
+CREATE INDEX IF NOT EXISTS idx_quality_inspections_record ON quality_inspections(record_id);
+
+
+-- ------------------------------------------------------------
+-- 데이터 버전 (REST API ETag, KPI 캐시 용)
+--   테이블마다 한 행. 쓰기 트랜잭션이 커밋되기 직전에(deferred 트리거) 변경한 테이블의 버전을 1 올린다.
+--   버전 행 잠금은 커밋 순간에만 잡히므로 쓰기 트랜잭션끼리 트랜잭션 내내 줄을 서지 않고,
+--   서로 다른 테이블을 쓰는 트랜잭션끼리는 아예 경합하지 않는다.
+-- ------------------------------------------------------------
+
+DO $$
+BEGIN
+    -- 예전 형식(모든 테이블이 한 행을 공유)이면 테이블별 형식으로 교체
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_schema = current_schema() AND table_name = 'data_version' AND column_name = 'id') THEN
+        DROP TABLE data_version;
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS data_version (
+    table_name VARCHAR(63) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO data_version (table_name) VALUES
+    ('production_lines'), ('products'), ('production_records'), ('quality_inspections')
+ON CONFLICT DO NOTHING;
+
+-- 이 트랜잭션에서 변경된 테이블의 버전을 올린다. 교착을 피하도록 항상 테이블 이름 순서로 잠근다.
+-- 불량 Top-N 인덱스가 어느 커밋까지 반영했는지 알 수 있도록 검사 테이블의 새 버전은 알림으로도 보낸다.
+CREATE OR REPLACE FUNCTION bump_data_versions() RETURNS void AS $$
+DECLARE
+    t TEXT;
+    v BIGINT;
+BEGIN
+    IF current_setting('data_version.pending', true) IS DISTINCT FROM 'on' THEN
+        RETURN;  -- 이미 올렸음 (deferred 트리거는 변경된 행마다 호출된다)
+    END IF;
+    PERFORM set_config('data_version.pending', '', true);
+    FOR t IN SELECT table_name FROM data_version ORDER BY table_name LOOP
+        IF current_setting('data_version.' || t, true) = 'on' THEN
+            PERFORM set_config('data_version.' || t, '', true);
+            UPDATE data_version SET version = version + 1 WHERE table_name = t RETURNING version INTO v;
+            IF t = 'quality_inspections' THEN
+                PERFORM pg_notify('defect_changes', json_build_object('version', v)::text);
+            END IF;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 문장 단위(즉시): 변경된 테이블만 표시. TRUNCATE 에는 행 트리거가 없으므로 바로 올린다.
+CREATE OR REPLACE FUNCTION mark_data_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM set_config('data_version.' || TG_TABLE_NAME, 'on', true);
+    PERFORM set_config('data_version.pending', 'on', true);
+    IF TG_OP = 'TRUNCATE' THEN
+        PERFORM bump_data_versions();
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 행 단위(커밋 직전, deferred): 표시된 테이블의 버전을 트랜잭션당 한 번 올린다
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+BEGIN
+    PERFORM bump_data_versions();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['production_lines', 'products', 'production_records', 'quality_inspections'] LOOP
+        -- 예전 문장 단위 트리거(즉시 공용 행 갱신)도 같은 이름이므로 함께 교체된다
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t || '_data_version', t);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t || '_data_changed', t);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION mark_data_changed()', t || '_data_changed', t);
+        EXECUTE format(
+            'CREATE CONSTRAINT TRIGGER %I AFTER INSERT OR UPDATE OR DELETE ON %I '
+            'DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE FUNCTION bump_data_version()',
+            t || '_data_version', t);
+    END LOOP;
+END $$;
+
+
+-- ------------------------------------------------------------
+-- 불량 집계 변경 알림 (Top-N 인덱스 용). 추가는 행 단위로, 수정/삭제는 전체 재적재 요청으로 알린다.
+--   한 트랜잭션 안의 같은 내용 알림은 하나로 합쳐지므로 검사 ID 를 넣어 행마다 다르게 만든다.
+-- ------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION notify_defect_insert() RETURNS trigger AS $$
+DECLARE
+    rec production_records%ROWTYPE;
+BEGIN
+    SELECT * INTO rec FROM production_records WHERE record_id = NEW.record_id;
+    PERFORM pg_notify('defect_changes', json_build_object(
+        'xid', pg_current_xact_id()::text,
+        'inspection_id', NEW.inspection_id,
+        'line_id', rec.line_id,
+        'production_date', rec.production_date,
+        'defect_type', NEW.defect_type,
+        'defect_count', NEW.defect_count
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION notify_defect_resync() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('defect_changes', '{"resync": true}');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS quality_inspections_defect_insert ON quality_inspections;
+CREATE TRIGGER quality_inspections_defect_insert
+    AFTER INSERT ON quality_inspections
+    FOR EACH ROW EXECUTE FUNCTION notify_defect_insert();
+DROP TRIGGER IF EXISTS quality_inspections_defect_resync ON quality_inspections;
+CREATE TRIGGER quality_inspections_defect_resync
+    AFTER UPDATE OR DELETE OR TRUNCATE ON quality_inspections
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_defect_resync();
+DROP TRIGGER IF EXISTS production_records_defect_resync ON production_records;
+CREATE TRIGGER production_records_defect_resync
+    AFTER UPDATE OF line_id, production_date OR DELETE ON production_records
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_defect_resync();
+
+COMMIT;
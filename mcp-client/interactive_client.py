@@ -1,19 +1,139 @@
+import argparse
 import asyncio
+import io
 import json
 import os
+import sys
+import time
 from mcp import ClientSession
 from mcp.client.streamable_http import streamablehttp_client
 
 
-async def main():
+def parse_value(value: str):
+    """key=value 의 value 를 JSON 으로 해석 (숫자, true/false, 리스트, 객체). 실패하면 문자열."""
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def result_payload(result):
+    """call_tool 결과의 텍스트 내용을 가능하면 JSON 으로 변환"""
+    texts = [c.text for c in result.content if getattr(c, "text", None) is not None]
+    if len(texts) != 1:
+        return texts
+    try:
+        return json.loads(texts[0])
+    except ValueError:
+        return texts[0]
+
+
+async def run_batch(session, source, output, concurrency: int):
+    """
+    JSON Lines 로 된 Tool 호출 목록을 한 세션에서 동시에 최대 concurrency 개씩 실행하고
+    결과를 NDJSON(완료 순서)으로 기록합니다.
+    
+    입력 한 줄 예: {"id": "r1", "tool": "get_lines", "args": {"status": "running"}}
+    출력 한 줄 예: {"id": "r1", "line": 1, "tool": "get_lines", "ok": true, "result": [...], "elapsed_ms": 12.3}
+    실패한 호출:   {"id": "r2", "line": 2, "tool": "없는_tool", "ok": false, "error": "...", "elapsed_ms": 1.2}
+    """
+    slots = asyncio.Semaphore(concurrency)
+    tasks = set()
+    failed = 0
+
+    def write(record):
+        output.write(json.dumps(record, default=str, ensure_ascii=False) + "\n")
+        output.flush()
+
+    async def call(line_no, request):
+        nonlocal failed
+        record = {"id": request.get("id", line_no), "line": line_no, "tool": request.get("tool")}
+        start = time.perf_counter()
+        try:
+            result = await session.call_tool(request["tool"], request.get("args") or {})
+            record["ok"] = not result.isError
+            if result.isError:
+                record["error"] = "\n".join(c.text for c in result.content if getattr(c, "text", None) is not None)
+            else:
+                record["result"] = result_payload(result)
+        except Exception as e:
+            record["ok"] = False
+            record["error"] = str(e)
+        finally:
+            record["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            slots.release()
+        if not record["ok"]:
+            failed += 1
+        write(record)
+
+    line_no = 0
+    while True:
+        # stdin 파이프가 느려도 진행 중인 호출이 멈추지 않도록 읽기는 스레드에서
+        line = await asyncio.to_thread(source.readline)
+        if not line:
+            break
+        line_no += 1
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict) or "tool" not in request:
+                raise ValueError('"tool" 키가 필요합니다')
+        except ValueError as e:
+            failed += 1
+            write({"line": line_no, "ok": False, "error": f"잘못된 입력: {e}"})
+            continue
+        await slots.acquire()
+        task = asyncio.create_task(call(line_no, request))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.gather(*tasks)
+    return failed
+
+
+async def main() -> int:
+    """종료 코드 반환: 0 정상, 1 연결 실패 또는 배치 호출 실패"""
+    parser = argparse.ArgumentParser(description="MCP 대화형 / 배치 클라이언트")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="JSON Lines 형식의 Tool 호출 목록 파일 ('-' 이면 stdin). 지정하면 배치 모드로 실행")
+    parser.add_argument("--concurrency", type=int, default=4, help="배치 모드 동시 실행 수 (기본 4)")
+    parser.add_argument("--output", metavar="FILE", help="배치 결과 NDJSON 파일 (기본 stdout)")
+    args = parser.parse_args()
+
     server_url = os.getenv("MCP_SERVER_URL", "http://localhost:8003/mcp")
-    print(f"서버 연결 중: {server_url}")
+    # 배치 모드에서는 stdout 이 결과 출력용이므로 안내 메시지는 stderr 로
+    log = sys.stderr if args.batch else sys.stdout
+
+    # 배치 입력은 연결 전에 읽고 디코딩까지 확인한다 (파일 오류를 연결 오류로 보고하지 않도록).
+    # 잘못된 JSON 줄은 실행 중 해당 줄의 실패로 기록된다.
+    source, output = sys.stdin, sys.stdout
+    if args.batch:
+        try:
+            if args.batch != "-":
+                with open(args.batch, encoding="utf-8") as f:
+                    source = io.StringIO(f.read())
+            if args.output:
+                output = open(args.output, "w", encoding="utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"배치 파일 오류: {e}", file=log)
+            return 1
+
+    print(f"서버 연결 중: {server_url}", file=log)
     
     try:
         async with streamablehttp_client(url=server_url) as streams:
             async with ClientSession(streams[0], streams[1]) as session:
                 await session.initialize()
-                print("✓ 서버 연결 성공\n")
+                print("✓ 서버 연결 성공\n", file=log)
+                
+                if args.batch:
+                    failed = await run_batch(session, source, output, max(1, args.concurrency))
+                    print(f"배치 완료 (실패 {failed}건)", file=log)
+                    return 1 if failed else 0
+                
                 
                 # Tool 목록 로드
                 tools_result = await session.list_tools()
@@ -58,11 +178,7 @@ async def main():
                         for part in parts[1:]:
                             if '=' in part:
                                 key, value = part.split('=', 1)
-                                try:
-                                    value = int(value)
-                                except ValueError:
-                                    pass
-                                params[key] = value
+                                params[key] = parse_value(value)
                         
                         if tool_name in tools:
                             print(f"호출: {tool_name}({params})")
@@ -81,11 +197,16 @@ async def main():
                     except Exception as e:
                         print(f"오류: {e}")
         
-        print("연결 종료됨")
+        print("연결 종료됨", file=log)
+        return 0
         
     except Exception as e:
-        print(f"연결 오류: {e}")
+        print(f"연결 오류: {e}", file=log)
+        return 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    sys.exit(asyncio.run(main()))
\ No newline at end of file
@@ -0,0 +1 @@
+"""서버 간 공용 모듈"""
@@ -0,0 +1,152 @@
+"""
+수용 제어(admission control) / 쿼리 타임아웃 / 취소 (모든 서버 공용)
+
+- Tool 별 statement_timeout (timeouts_ms, 없으면 커넥션 기본값)
+- 전역 / 세션별 동시 실행 제한. 자리가 없으면 queue_timeout 까지 대기,
+  대기열이 max_queue 를 넘으면 즉시 거절 (Overloaded)
+- 클라이언트가 요청을 취소하거나 연결이 끊기면 실행 중인 Postgres 쿼리도 취소
+- 취소되어도 작업 스레드는 끝날 때까지 커넥션을 쥐고 있으므로 자리는 스레드가 끝날 때 반납
+
+사용:
+    from common.admission import AdmissionController
+    admission = AdmissionController(max_concurrent, per_session, max_queue, queue_timeout, TOOL_TIMEOUTS_MS)
+
+    @mcp.tool
+    @admission.controlled
+    def get_lines(...): ...
+"""
+
+import asyncio
+import functools
+import json
+from contextvars import ContextVar, copy_context
+
+
+class ToolCall:
+    """실행 중인 Tool 호출 상태 (타임아웃, 사용 중인 커넥션)"""
+
+    def __init__(self, tool: str, timeout_ms: int = None):
+        self.tool = tool
+        self.timeout_ms = timeout_ms  # None 이면 커넥션 기본 statement_timeout
+        self.conns = []
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True  # 아직 커넥션을 얻기 전이면 get_conn 에서 중단
+        for conn in list(self.conns):
+            if not conn.closed:
+                conn.cancel()
+
+
+# 작업 스레드에서 Database.get_conn 이 현재 Tool 호출을 알 수 있도록 run() 이 설정한다
+current_call = ContextVar("current_call", default=None)
+
+
+class Overloaded(Exception):
+    """동시 실행 한도 초과로 요청을 거절한 경우"""
+
+
+def session_key(ctx) -> str:
+    """MCP 세션 식별자 (read-your-writes 추적, 세션별 동시 실행 제한용)"""
+    if ctx is None:
+        return None
+    try:
+        return ctx.session_id
+    except Exception:
+        try:
+            return str(id(ctx.session))
+        except Exception:
+            return None
+
+
+class AdmissionController:
+    """전역 / 세션별 동시 실행 제한 + 제한된 대기열"""
+
+    def __init__(self, max_concurrent: int, per_session: int, max_queue: int, queue_timeout: float,
+                 timeouts_ms: dict = None):
+        self._global = asyncio.Semaphore(max_concurrent)
+        self._per_session = per_session
+        self._sessions = {}  # session -> [Semaphore, 사용자 수]
+        self._max_queue = max_queue
+        self._queue_timeout = queue_timeout
+        self._timeouts_ms = timeouts_ms or {}
+        self._waiting = 0
+
+    async def acquire(self, session: str = None):
+        """자리를 얻을 때까지 대기하고 반납 함수를 반환 (대기열 초과 / 대기 시간 초과 시 Overloaded)"""
+        if self._waiting >= self._max_queue:
+            raise Overloaded(f"요청이 많아 처리할 수 없습니다 (대기 {self._waiting}건)")
+        entry = None
+        if session is not None:
+            entry = self._sessions.setdefault(session, [asyncio.Semaphore(self._per_session), 0])
+            entry[1] += 1
+        acquired = []
+        release = functools.partial(self._release, session, entry, acquired)
+        self._waiting += 1
+        try:
+            async with asyncio.timeout(self._queue_timeout):
+                if entry is not None:
+                    await entry[0].acquire()
+                    acquired.append(entry[0])
+                await self._global.acquire()
+                acquired.append(self._global)
+        except TimeoutError:
+            release()
+            raise Overloaded(f"요청이 많아 {self._queue_timeout}초 안에 처리를 시작하지 못했습니다")
+        except BaseException:
+            release()
+            raise
+        finally:
+            self._waiting -= 1
+        return release
+
+    def _release(self, session: str, entry: list, acquired: list):
+        for sem in acquired:
+            sem.release()
+        acquired.clear()
+        if entry is not None:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._sessions.pop(session, None)
+
+    async def run(self, fn, session: str, name: str, args: tuple, kwargs: dict):
+        """자리를 얻은 뒤 동기 함수 fn 을 작업 스레드에서 실행
+
+        요청이 취소되면 실행 중인 쿼리를 취소하지만, 자리는 작업 스레드가 실제로 끝날 때 반납한다.
+        (스레드가 커넥션을 쥐고 있는 동안 자리를 먼저 내주면 수용된 작업이 풀 크기를 넘을 수 있다)
+        """
+        release = await self.acquire(session)
+        call = ToolCall(name, self._timeouts_ms.get(name))
+        context = copy_context()
+        context.run(current_call.set, call)
+
+        def finished(future):
+            release()
+            if not future.cancelled():
+                future.exception()  # 취소된 요청의 결과는 버린다 (미회수 예외 경고 방지)
+
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(context.run, fn, *args, **kwargs))
+        except BaseException:
+            release()
+            raise
+        future.add_done_callback(finished)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+
+    def controlled(self, fn):
+        """동기 MCP Tool 함수를 수용 제어 + 타임아웃 + 취소가 적용된 비동기 Tool 로 감싼다
+
+        거절되면 {"error", "overloaded": true} JSON 을 반환한다. 세션은 ctx 인자에서 찾는다.
+        """
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await self.run(fn, session_key(kwargs.get("ctx")), fn.__name__, args, kwargs)
+            except Overloaded as e:
+                return json.dumps({"error": str(e), "overloaded": True}, ensure_ascii=False)
+        return wrapper
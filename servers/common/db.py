@@ -0,0 +1,341 @@
+"""
+DB 접근 (모든 서버 공용)
+
+- URL 별 커넥션 풀. 풀이 가득 차면 pool_timeout 까지 빈 자리를 기다리고, 그래도 없으면 PoolBusy
+- Prepared statement 레지스트리: 커넥션마다 처음 사용할 때 한 번만 PREPARE 하고 이후에는 EXECUTE
+- Read replica 라우팅과 세션별 read-your-writes
+- 같은 스레드의 중첩 get_conn 은 바깥 커넥션(트랜잭션)을 그대로 사용
+
+설정은 서버마다 다르므로(환경 변수, statement 목록) 서버가 Database 를 만들어 사용한다.
+    from common.db import SHARED_STATEMENTS, Database, dict_cursor
+    db = Database(DB_URL, {**SHARED_STATEMENTS, ...}, pool_max=DB_POOL_MAX, ...)
+    with db.get_conn(readonly=True, session=session) as conn:
+        with dict_cursor(conn) as cur:
+            db.execute(cur, "lines_all")
+"""
+
+import functools
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from common.admission import current_call
+
+log = logging.getLogger("db")
+
+
+# 여러 서버와 공용 모듈(적재 저널 등)이 함께 쓰는 statement: 이름 -> (파라미터 타입, SQL)
+# 서버 전용 statement 는 각 서버에서 이 목록에 더해 Database 에 넘긴다.
+SHARED_STATEMENTS = {
+    "lines_all": ((), "SELECT * FROM production_lines ORDER BY line_id"),
+    "lines_by_status": (("varchar",), """
+        SELECT * FROM production_lines WHERE status = $1 ORDER BY line_id
+    """),
+    "products_all": ((), "SELECT * FROM products ORDER BY product_id"),
+    "production_insert": (("varchar", "varchar", "int", "int", "int", "int", "int"), """
+        INSERT INTO production_records
+        (line_id, product_id, target_qty, produced_qty, defect_qty, planned_minutes, run_minutes)
+        VALUES ($1, $2, $3, $4, $5, $6, $7)
+    """),
+    "production_insert_batch": (("varchar[]", "varchar[]", "varchar[]", "int[]", "int[]", "int[]", "int[]", "int[]"), """
+        INSERT INTO production_records
+        (ingest_key, line_id, product_id, target_qty, produced_qty, defect_qty, planned_minutes, run_minutes)
+        SELECT * FROM unnest($1, $2, $3, $4, $5, $6, $7, $8)
+        ON CONFLICT (ingest_key) DO NOTHING
+    """),
+    "production_record": (("int",), """
+        SELECT record_id, line_id, product_id, production_date,
+               target_qty, produced_qty, defect_qty
+        FROM production_records
+        WHERE record_id = $1
+    """),
+    "inspections_by_record": (("int",), """
+        SELECT inspection_id, defect_type, defect_count
+        FROM quality_inspections
+        WHERE record_id = $1
+        ORDER BY inspection_id
+    """),
+    # 품질 검사 일괄 등록: 대상 실적 행을 record_id 순서로 잠가(교착 방지) 동시 등록을 직렬화하고
+    # 현재 불량 수량을 함께 읽어 등록 후 생산 수량 초과를 검증한다
+    "inspection_lock_records": (("int[]",), """
+        SELECT r.record_id, r.produced_qty, COALESCE(r.defect_qty, 0) as defect_qty
+        FROM production_records r
+        WHERE r.record_id = ANY($1)
+        ORDER BY r.record_id
+        FOR UPDATE
+    """),
+    "inspection_insert_batch": (("int[]", "varchar[]", "int[]"), """
+        INSERT INTO quality_inspections (record_id, defect_type, defect_count)
+        SELECT * FROM unnest($1, $2, $3)
+    """),
+    # 이번에 등록한 검사 불량만큼 defect_qty 를 늘린다 (검사 외 불량 수량에 더해짐)
+    "inspection_add_defect_qty": (("int[]", "int[]"), """
+        UPDATE production_records r
+        SET defect_qty = COALESCE(r.defect_qty, 0) + a.qty
+        FROM unnest($1, $2) a(record_id, qty)
+        WHERE r.record_id = a.record_id
+        RETURNING r.record_id, r.defect_qty
+    """),
+    # 테이블별 데이터 버전(init-db/03-upgrade.sql)을 테이블 이름 순으로 이은 문자열. ETag / 캐시 키 용
+    "data_version": (("varchar[]",), """
+        SELECT string_agg(version::text, '.' ORDER BY table_name) as version
+        FROM data_version
+        WHERE table_name = ANY($1)
+    """),
+    "dashboard_line_status": ((), """
+        SELECT status, COUNT(*) as cnt FROM production_lines GROUP BY status
+    """),
+    "dashboard_today": ((), """
+        SELECT COALESCE(SUM(produced_qty), 0) as produced,
+               COALESCE(SUM(defect_qty), 0) as defects
+        FROM production_records
+        WHERE production_date = CURRENT_DATE
+    """),
+    "table_version": (("varchar",), """
+        SELECT version FROM data_version WHERE table_name = $1
+    """),
+    "dashboard_top_defects": ((), """
+        SELECT defect_type, SUM(defect_count) as cnt
+        FROM quality_inspections
+        GROUP BY defect_type
+        ORDER BY cnt DESC, defect_type COLLATE "C" LIMIT 3
+    """),
+}
+
+
+class PoolBusy(Exception):
+    """pool_timeout 안에 풀에서 커넥션을 얻지 못한 경우"""
+
+
+# psycopg2 등 무거운 모듈은 처음 DB 에 접속할 때 import 한다 (기동 시간 단축)
+
+@functools.cache
+def _connection_factory():
+    """PREPARE 된 statement 이름을 기억하는 커넥션 클래스"""
+    import psycopg2.extensions
+
+    class PreparedConnection(psycopg2.extensions.connection):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.prepared = set()
+
+    return PreparedConnection
+
+
+def dict_cursor(conn):
+    """행을 dict 로 돌려주는 커서 (RealDictCursor)"""
+    from psycopg2.extras import RealDictCursor
+    return conn.cursor(cursor_factory=RealDictCursor)
+
+
+def _lsn(value: str) -> int:
+    """'16/B374D848' 형식의 LSN 을 비교 가능한 정수로 변환"""
+    hi, lo = value.split("/")
+    return (int(hi, 16) << 32) | int(lo, 16)
+
+
+class Database:
+    """primary(url) 와 읽기 전용 replica 들에 대한 커넥션 풀, statement 실행, 라우팅"""
+
+    def __init__(self, url: str, statements: dict, replica_urls: list = (),
+                 pool_min: int = 1, pool_max: int = 10, pool_timeout: float = 5.0,
+                 statement_timeout_ms: int = 10000, replica_max_lag: float = 5.0,
+                 replica_check_interval: float = 2.0, session_lsn_max: int = 10000):
+        self.url = url
+        self.statements = statements
+        self.replica_urls = list(replica_urls)
+        self.pool_min = pool_min
+        self.pool_max = pool_max
+        self.pool_timeout = pool_timeout
+        self.statement_timeout_ms = statement_timeout_ms
+        self.replica_max_lag = replica_max_lag
+        self.replica_check_interval = replica_check_interval
+        self.session_lsn_max = session_lsn_max
+        self._pools = {}
+        self._pool_slots = {}  # url -> BoundedSemaphore(pool_max). getconn 전에 빈 자리를 기다린다
+        self._pool_lock = threading.Lock()
+        self._replica_status = {}          # url -> (확인 시각, replay LSN 또는 None(사용 불가))
+        self._session_lsn = OrderedDict()  # session -> 마지막 쓰기의 primary LSN
+        self._replica_rr = itertools.count()
+        self._session_lock = threading.Lock()
+        self._local = threading.local()
+
+    def get_pool(self, url: str = None):
+        """URL 별 커넥션 풀 (최초 호출 시 생성). 기본은 primary."""
+        url = url or self.url
+        pool = self._pools.get(url)
+        if pool is None:
+            from psycopg2.pool import ThreadedConnectionPool
+            with self._pool_lock:
+                pool = self._pools.get(url)
+                if pool is None:
+                    pool = ThreadedConnectionPool(
+                        self.pool_min, self.pool_max, url,
+                        connection_factory=_connection_factory(),
+                        options=f"-c statement_timeout={self.statement_timeout_ms}"
+                    )
+                    self._pool_slots[url] = threading.BoundedSemaphore(self.pool_max)
+                    self._pools[url] = pool
+        return pool
+
+    @contextmanager
+    def pooled_conn(self, url: str = None):
+        """풀에서 커넥션을 빌렸다가 반납
+
+        ThreadedConnectionPool.getconn 은 풀이 가득 차면 바로 PoolError 를 내므로, 풀 크기만큼의
+        세마포어로 빈 자리를 pool_timeout 까지 기다린 뒤 꺼낸다. 시간 안에 못 얻으면 PoolBusy.
+        """
+        url = url or self.url
+        pool = self.get_pool(url)
+        slots = self._pool_slots[url]
+        if not slots.acquire(timeout=self.pool_timeout):
+            raise PoolBusy(f"DB 커넥션이 모두 사용 중입니다. 잠시 후 다시 시도하세요 ({self.pool_timeout}초 대기)")
+        try:
+            conn = pool.getconn()
+            try:
+                yield conn
+            finally:
+                pool.putconn(conn, close=bool(conn.closed))
+        finally:
+            slots.release()
+
+    def execute(self, cur, name: str, params: tuple = ()):
+        """등록된 statement 를 이름으로 실행 (해당 커넥션에서 처음이면 PREPARE 먼저)"""
+        types, sql = self.statements[name]
+        prepared = cur.connection.prepared
+        if name not in prepared:
+            arg_types = f" ({', '.join(types)})" if types else ""
+            cur.execute(f"PREPARE {name}{arg_types} AS {sql}")
+            prepared.add(name)
+        if params:
+            cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+        else:
+            cur.execute(f"EXECUTE {name}")
+
+    # ------------------------------------------------------------
+    # Read replica 라우팅
+    #   - 쓰기는 항상 primary
+    #   - 읽기는 지연(lag)이 허용치 이내인 replica 로 라운드로빈, 없으면 primary
+    #   - 세션이 마지막으로 쓴 WAL 위치(LSN)를 기억해 replica 가 따라잡기 전까지는 primary 에서 읽음
+    # ------------------------------------------------------------
+
+    def _replica_lsn(self, url: str):
+        """replica 의 replay LSN (지연이 허용치를 넘거나 접속 불가면 None). replica_check_interval 동안 캐시."""
+        checked_at, lsn = self._replica_status.get(url, (0.0, None))
+        if time.monotonic() - checked_at < self.replica_check_interval:
+            return lsn
+        lsn = None
+        try:
+            with self.pooled_conn(url) as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        SELECT pg_is_in_recovery(), pg_last_wal_replay_lsn()::text,
+                               CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                                    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+                               END
+                    """)
+                    in_recovery, replay_lsn, lag = cur.fetchone()
+                conn.rollback()
+                if in_recovery and replay_lsn and lag <= self.replica_max_lag:
+                    lsn = _lsn(replay_lsn)
+        except Exception:
+            lsn = None
+        self._replica_status[url] = (time.monotonic(), lsn)
+        return lsn
+
+    def _route(self, readonly: bool, session: str = None) -> str:
+        """요청을 보낼 DB URL 선택"""
+        if not readonly or not self.replica_urls:
+            return self.url
+        min_lsn = self._session_lsn.get(session) if session else None
+        start = next(self._replica_rr)
+        for i in range(len(self.replica_urls)):
+            url = self.replica_urls[(start + i) % len(self.replica_urls)]
+            lsn = self._replica_lsn(url)
+            if lsn is not None and (min_lsn is None or lsn >= min_lsn):
+                return url
+        return self.url
+
+    def _remember_write(self, conn, session: str):
+        """쓰기 커밋 직후의 primary LSN 을 세션별로 기록 (read-your-writes)
+
+        쓰기는 이미 커밋된 뒤이므로 실패해도 예외를 내지 않고 기록만 건너뛴다.
+        (요청이 실패로 보이면 클라이언트 재시도로 중복 적재될 수 있다)
+        """
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_current_wal_lsn()::text")
+                lsn = _lsn(cur.fetchone()[0])
+            conn.rollback()
+        except Exception:
+            log.warning("read-your-writes 용 LSN 기록 실패 (session=%s)", session, exc_info=True)
+            if not conn.closed:
+                conn.rollback()
+            return
+        with self._session_lock:
+            self._session_lsn[session] = lsn
+            self._session_lsn.move_to_end(session)
+            while len(self._session_lsn) > self.session_lsn_max:
+                self._session_lsn.popitem(last=False)
+
+    def _check_nested(self, readonly: bool, session: str, isolation: str):
+        """중첩 get_conn 이 바깥 트랜잭션을 그대로 써도 되는지 확인 (맞지 않으면 RuntimeError)"""
+        outer_readonly, outer_session, outer_isolation, outer_url = self._local.conn_args
+        if outer_readonly and not readonly:
+            raise RuntimeError("읽기 전용 트랜잭션 안에서 쓰기 커넥션을 요청했습니다")
+        if isolation and isolation != outer_isolation:
+            raise RuntimeError(
+                f"바깥 트랜잭션({outer_isolation or '기본 격리 수준'})과 다른 격리 수준({isolation})을 요청했습니다"
+            )
+        if session != outer_session and outer_url != self.url:
+            raise RuntimeError("다른 세션이 연 replica 트랜잭션은 read-your-writes 를 보장할 수 없습니다")
+
+    @contextmanager
+    def get_conn(self, readonly: bool = False, session: str = None, isolation: str = None):
+        """풀에서 커넥션을 빌려 트랜잭션 단위로 사용 (정상 종료 시 commit, 예외 시 rollback)
+
+        readonly=True 이면 replica 로 라우팅될 수 있으며, session 을 주면 같은 세션의 쓰기가
+        반영된 replica 만 사용합니다. isolation 을 주면 트랜잭션 시작 시 격리 수준을 지정합니다.
+        같은 스레드에서 중첩 호출하면 바깥 커넥션(트랜잭션)을 그대로 씁니다. 이때 인자가 바깥 트랜잭션과
+        맞지 않으면 (읽기 전용 안에서 쓰기, 다른 격리 수준, 다른 세션의 replica) RuntimeError 를 냅니다.
+        Tool 호출 중이면 Tool 별 statement_timeout 을 적용하고, 취소 시 쿼리를 끊을 수 있도록 커넥션을 등록합니다.
+        풀이 가득 차면 pool_timeout 까지 기다리고, 그래도 자리가 없으면 PoolBusy 를 냅니다.
+        """
+        outer = getattr(self._local, "conn", None)
+        if outer is not None:
+            self._check_nested(readonly, session, isolation)
+            yield outer
+            return
+
+        call = current_call.get()
+        if call is not None and call.cancelled:
+            raise RuntimeError("취소된 요청입니다")
+        timeout_ms = call.timeout_ms if call is not None and call.timeout_ms else self.statement_timeout_ms
+        url = self._route(readonly, session)
+        with self.pooled_conn(url) as conn:
+            if call is not None:
+                call.conns.append(conn)
+            self._local.conn = conn
+            self._local.conn_args = (readonly, session, isolation, url)
+            try:
+                if isolation or timeout_ms != self.statement_timeout_ms:
+                    with conn.cursor() as cur:
+                        if isolation:
+                            cur.execute(f"SET TRANSACTION ISOLATION LEVEL {isolation}")
+                        if timeout_ms != self.statement_timeout_ms:
+                            cur.execute("SET LOCAL statement_timeout = %s", (timeout_ms,))
+                yield conn
+                conn.commit()
+            except Exception:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+            finally:
+                self._local.conn = None
+                if call is not None:
+                    call.conns.remove(conn)
+            if not readonly and session and self.replica_urls:
+                self._remember_write(conn, session)
@@ -0,0 +1,161 @@
+"""
+Write-behind 적재 (INGEST_MODE=async, 모든 서버 공용)
+
+생산 실적을 로컬 SQLite 저널에 기록(fsync)한 뒤 바로 응답하고,
+백그라운드 flusher 가 저널을 배치 단위로 Postgres 에 반영한다.
+반영되지 않은 저널은 재시작 시 그대로 다시 적재되며, ingest_key 로 중복 적재를 막는다.
+
+사용:
+    from common.ingest import IngestBackpressure, IngestJournal
+    journal = IngestJournal(INGEST_JOURNAL_PATH, db, queue_max=..., batch_size=..., ...)
+    key = journal.append((line_id, product_id, target_qty, produced_qty, defect_qty,
+                          planned_minutes, run_minutes))
+"""
+
+import json
+import threading
+import uuid
+from pathlib import Path
+
+
+class IngestBackpressure(Exception):
+    """저널 대기열이 가득 찬 경우"""
+
+
+class IngestJournal:
+    """SQLite 저널 + 백그라운드 flusher
+
+    저널 파일은 처음 사용할 때 연다 (sync 모드 서버는 파일을 만들지 않는다).
+    start() 또는 첫 append()/status() 에서 flusher 가 시작되며, 이때 남아 있던 저널도 재적재된다.
+    """
+
+    def __init__(self, path: Path, db, queue_max: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 0.5, retry_max_delay: float = 30.0):
+        self.path = Path(path)
+        self.queue_max = queue_max
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_max_delay = retry_max_delay
+        self._target = db  # 적재 대상 Database (production_insert_batch statement 사용)
+        self._db = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._started = False
+        self.pending = 0
+        self.last_error = None
+
+    def _open(self):
+        """저널 파일을 열고 미반영 건수를 읽는다 (이미 열려 있으면 아무것도 하지 않음)"""
+        with self._lock:
+            if self._db is not None:
+                return
+            import sqlite3
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=FULL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS journal (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    ingest_key TEXT NOT NULL,
+                    payload TEXT NOT NULL
+                )
+            """)
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS dead_letter (
+                    ingest_key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    error TEXT,
+                    failed_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            self.pending = db.execute("SELECT COUNT(*) FROM journal").fetchone()[0]
+            self._db = db
+
+    def start(self):
+        """저널을 열고 flusher 스레드 시작 (여러 번 호출해도 한 번만 시작)"""
+        self._open()
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._run, name="ingest-flusher", daemon=True).start()
+
+    def append(self, row: tuple) -> str:
+        """행을 저널에 기록하고 ingest_key 반환. 대기열이 가득 차면 IngestBackpressure."""
+        self.start()
+        with self._lock:
+            if self.pending >= self.queue_max:
+                raise IngestBackpressure(f"적재 대기열이 가득 찼습니다 ({self.pending}건)")
+            key = uuid.uuid4().hex
+            self._db.execute(
+                "INSERT INTO journal (ingest_key, payload) VALUES (?, ?)",
+                (key, json.dumps(row, ensure_ascii=False))
+            )
+            self.pending += 1
+            if self.pending >= self.batch_size:
+                self._wake.set()
+        return key
+
+    def status(self) -> dict:
+        self.start()
+        with self._lock:
+            dead = self._db.execute("SELECT COUNT(*) FROM dead_letter").fetchone()[0]
+        return {"mode": "async", "pending": self.pending, "dead_letter": dead,
+                "last_error": self.last_error}
+
+    def _run(self):
+        delay = self.flush_interval
+        while True:
+            self._wake.wait(delay)
+            self._wake.clear()
+            try:
+                while self._flush_once():
+                    pass
+                delay = self.flush_interval
+                self.last_error = None
+            except Exception as e:
+                # DB 장애 등 일시적 오류: 저널은 그대로 두고 지수 백오프 후 재시도
+                self.last_error = str(e)
+                delay = min(max(delay, self.flush_interval) * 2, self.retry_max_delay)
+
+    def _flush_once(self) -> bool:
+        """저널 앞부분을 한 배치 적재. 더 남아 있으면 True."""
+        import psycopg2
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, ingest_key, payload FROM journal ORDER BY seq LIMIT ?",
+                (self.batch_size,)
+            ).fetchall()
+        if not rows:
+            return False
+
+        # 가동 시간 필드가 추가되기 전에 기록된 저널 행(5개 필드)은 None 으로 채운다
+        batch = [(key, *(json.loads(payload) + [None, None])[:7]) for _, key, payload in rows]
+        try:
+            self._insert(batch)
+            dead = []
+        except (psycopg2.IntegrityError, psycopg2.DataError):
+            # 잘못된 행이 섞인 배치: 한 건씩 적재하고 실패한 행은 dead_letter 로 격리
+            dead = []
+            for row in batch:
+                try:
+                    self._insert([row])
+                except (psycopg2.IntegrityError, psycopg2.DataError) as e:
+                    dead.append((row[0], json.dumps(row[1:], ensure_ascii=False), str(e)))
+
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT OR REPLACE INTO dead_letter (ingest_key, payload, error) VALUES (?, ?, ?)", dead
+            )
+            self._db.execute("DELETE FROM journal WHERE seq <= ?", (rows[-1][0],))
+            self._db.execute("COMMIT")
+            self.pending -= len(rows)
+        return len(rows) == self.batch_size
+
+    def _insert(self, batch: list):
+        columns = tuple(map(list, zip(*batch)))
+        with self._target.get_conn() as conn:
+            with conn.cursor() as cur:
+                self._target.execute(cur, "production_insert_batch", columns)
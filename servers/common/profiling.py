@@ -0,0 +1,303 @@
+"""
+온디맨드 프로파일링 (관리자 전용, 모든 서버 공용)
+
+admin_profile 로 대상 Tool 의 다음 N 회 호출을 cProfile 또는 샘플링 프로파일러로 측정하고,
+선택적으로 tracemalloc 스냅샷을 남긴다. 결과는 PROFILE_DIR 에 저장된다.
+요청이 없을 때는 dict 조회 한 번 외에 추가 비용이 없다.
+
+사용:
+    from common.profiling import profiled, register_admin_tools
+    register_admin_tools(mcp)   # admin_profile / admin_list_profiles / admin_download_profile
+"""
+
+import base64
+import functools
+import hmac
+import inspect
+import json
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+log = logging.getLogger("profiling")
+
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+# 기본값은 이 모듈 기준 ../data/profiles (저장소에서는 servers/data/profiles, 컨테이너에서는 /app/data/profiles)
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", Path(__file__).resolve().parent.parent / "data" / "profiles"))
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get("PROFILE_SAMPLE_INTERVAL", "0.005"))
+
+_profile_requests = {}  # 대상 이름 -> {"remaining", "mode", "memory"}
+_profile_lock = threading.Lock()
+
+
+def _check_admin(token: str):
+    if not ADMIN_TOKEN or not hmac.compare_digest(token or "", ADMIN_TOKEN):
+        raise PermissionError("관리자 토큰이 올바르지 않습니다")
+
+
+class _StackSampler:
+    """대상 스레드의 스택을 주기적으로 수집해 folded stack(flamegraph 입력) 형식으로 집계
+
+    code 를 주면 그 코드 객체의 프레임이 스택에 있을 때만 집계한다. 코루틴은 이벤트 루프 스레드를
+    다른 코루틴과 나눠 쓰므로, 대상 코루틴이 실제로 실행 중인 샘플만 남기기 위해 사용한다.
+    """
+
+    def __init__(self, thread_id: int, code=None):
+        self._thread_id = thread_id
+        self._code = code
+        self._stop = threading.Event()
+        self.stacks = Counter()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(PROFILE_SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            matched = self._code is None
+            while frame is not None:
+                stack.append(f"{Path(frame.f_code.co_filename).name}:{frame.f_code.co_name}")
+                matched = matched or frame.f_code is self._code
+                frame = frame.f_back
+            if stack and matched:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _take_profile_request(target: str):
+    """대상의 프로파일링 요청이 남아 있으면 1회 소비하여 반환"""
+    with _profile_lock:
+        request = _profile_requests.get(target)
+        if request is None:
+            return None
+        request["remaining"] -= 1
+        if request["remaining"] <= 0:
+            del _profile_requests[target]
+        return dict(request)
+
+
+# tracemalloc 은 프로세스 전역이므로 겹치는 memory 프로파일링은 참조 카운트로 공유한다.
+# 마지막 사용자가 끝날 때, 그리고 우리가 켠 경우에만 끈다.
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+
+def _tracemalloc_acquire():
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0:
+            _tracemalloc_owned = not tracemalloc.is_tracing()
+            if _tracemalloc_owned:
+                tracemalloc.start(25)
+        _tracemalloc_users += 1
+
+
+def _tracemalloc_release():
+    """스냅샷을 찍고 사용자 수를 줄인다 (스냅샷과 stop 사이에 끼어들지 않도록 lock 안에서)"""
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        try:
+            return tracemalloc.take_snapshot()
+        finally:
+            _tracemalloc_users -= 1
+            if _tracemalloc_users == 0 and _tracemalloc_owned:
+                tracemalloc.stop()
+
+
+class _ProfileSession:
+    """한 번의 호출을 측정하고 결과 파일을 저장
+
+    측정이나 저장이 실패해도 로그만 남긴다. 프로파일링이 Tool 결과를 바꾸면 안 된다.
+    """
+
+    def __init__(self, target: str, request: dict, code=None):
+        self.target = target
+        self.request = request
+        self._code = code
+        self._profiler = None
+        self._tracing = False
+
+    def __enter__(self):
+        try:
+            if self.request["memory"]:
+                _tracemalloc_acquire()
+                self._tracing = True
+            if self.request["mode"] == "sample":
+                self._profiler = _StackSampler(threading.get_ident(), self._code).__enter__()
+            else:
+                import cProfile
+                profiler = cProfile.Profile()
+                profiler.enable()
+                self._profiler = profiler
+        except Exception:
+            log.exception("프로파일링 시작 실패: %s", self.target)
+        return self
+
+    def __exit__(self, *exc):
+        snapshot = None
+        try:
+            try:
+                if self._profiler is not None:
+                    if self.request["mode"] == "sample":
+                        self._profiler.__exit__(*exc)
+                    else:
+                        self._profiler.disable()
+            finally:
+                if self._tracing:
+                    snapshot = _tracemalloc_release()
+            self._save(snapshot)
+        except Exception:
+            log.exception("프로파일 결과 저장 실패: %s", self.target)
+
+    def _save(self, snapshot):
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        stem = PROFILE_DIR / f"{self.target}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+        if self._profiler is not None:
+            if self.request["mode"] == "sample":
+                stem.with_suffix(".folded").write_text(
+                    "".join(f"{stack} {count}\n" for stack, count in self._profiler.stacks.items()),
+                    encoding="utf-8"
+                )
+            else:
+                self._profiler.dump_stats(str(stem.with_suffix(".pstats")))
+        if snapshot is not None:
+            snapshot.dump(str(stem.with_suffix(".tracemalloc")))
+            stem.with_suffix(".mem.txt").write_text(
+                "\n".join(str(stat) for stat in snapshot.statistics("lineno")[:50]),
+                encoding="utf-8"
+            )
+
+
+def profiled(fn):
+    """admin_profile 로 요청된 경우에만 호출을 프로파일링 (동기/비동기 함수 모두 지원)
+
+    코루틴은 await 동안 같은 스레드에서 다른 코루틴이 실행되므로 cProfile 로는 측정할 수 없다.
+    요청한 mode 와 관계없이 샘플러로 대상 코루틴이 실행 중인 스택만 수집한다.
+    """
+    target = fn.__name__
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            if target not in _profile_requests:
+                return await fn(*args, **kwargs)
+            request = _take_profile_request(target)
+            if request is None:
+                return await fn(*args, **kwargs)
+            with _ProfileSession(target, dict(request, mode="sample"), code=fn.__code__):
+                return await fn(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if target not in _profile_requests:
+            return fn(*args, **kwargs)
+        request = _take_profile_request(target)
+        if request is None:
+            return fn(*args, **kwargs)
+        with _ProfileSession(target, request):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def request_profile(token: str, target: str, calls: int = 1, mode: str = "cprofile", memory: bool = False) -> dict:
+    """프로파일링 요청 등록 (공통)"""
+    _check_admin(token)
+    if mode not in ("cprofile", "sample"):
+        raise ValueError("mode 는 cprofile 또는 sample 이어야 합니다")
+    with _profile_lock:
+        if calls <= 0:
+            _profile_requests.pop(target, None)
+        else:
+            _profile_requests[target] = {"remaining": calls, "mode": mode, "memory": memory}
+        return {"pending": {name: dict(req) for name, req in _profile_requests.items()}}
+
+
+def list_profiles(token: str) -> list:
+    """저장된 프로파일 결과 목록 (공통)"""
+    _check_admin(token)
+    if not PROFILE_DIR.exists():
+        return []
+    return [
+        {"name": path.name, "size": path.stat().st_size,
+         "created": datetime.fromtimestamp(path.stat().st_mtime).isoformat()}
+        for path in sorted(PROFILE_DIR.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True)
+    ]
+
+
+def profile_path(token: str, name: str) -> Path:
+    """다운로드할 프로파일 결과 파일 경로 (공통)"""
+    _check_admin(token)
+    path = PROFILE_DIR / Path(name).name
+    if not path.is_file():
+        raise FileNotFoundError(f"프로파일 결과가 없습니다: {name}")
+    return path
+
+
+def register_admin_tools(mcp):
+    """관리자용 프로파일링 Tool 을 mcp 서버에 등록"""
+
+    @mcp.tool
+    def admin_profile(token: str, target: str, calls: int = 1, mode: str = "cprofile", memory: bool = False) -> str:
+        """
+        [관리자] 지정한 Tool 의 다음 호출들을 프로파일링합니다.
+        
+        Args:
+            token: 관리자 토큰 (ADMIN_TOKEN)
+            target: 대상 Tool 이름
+            calls: 프로파일링할 호출 횟수. 0 이면 요청 취소.
+            mode: cprofile (pstats 파일) 또는 sample (folded stack, flamegraph 입력). 코루틴 Tool 은 항상 sample
+            memory: True 이면 tracemalloc 할당 스냅샷도 저장
+        
+        Returns:
+            대기 중인 프로파일링 요청 목록
+        """
+        try:
+            return json.dumps(request_profile(token, target, calls, mode, memory), ensure_ascii=False)
+        except (PermissionError, ValueError) as e:
+            return json.dumps({"error": str(e)}, ensure_ascii=False)
+
+    @mcp.tool
+    def admin_list_profiles(token: str) -> str:
+        """
+        [관리자] 저장된 프로파일 결과 목록을 조회합니다.
+        
+        Args:
+            token: 관리자 토큰 (ADMIN_TOKEN)
+        
+        Returns:
+            파일 이름, 크기, 생성 시각
+        """
+        try:
+            return json.dumps(list_profiles(token), ensure_ascii=False)
+        except PermissionError as e:
+            return json.dumps({"error": str(e)}, ensure_ascii=False)
+
+    @mcp.tool
+    def admin_download_profile(token: str, name: str) -> str:
+        """
+        [관리자] 프로파일 결과 파일을 내려받습니다.
+        
+        Args:
+            token: 관리자 토큰 (ADMIN_TOKEN)
+            name: 파일 이름 (admin_list_profiles 결과)
+        
+        Returns:
+            파일 이름과 base64 로 인코딩된 내용
+        """
+        try:
+            path = profile_path(token, name)
+            return json.dumps({"name": path.name, "content_base64": base64.b64encode(path.read_bytes()).decode()})
+        except (PermissionError, FileNotFoundError) as e:
+            return json.dumps({"error": str(e)}, ensure_ascii=False)
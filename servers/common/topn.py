@@ -0,0 +1,222 @@
+"""
+불량 유형 Top-N 인덱스 (모든 서버 공용)
+
+quality_inspections 변경을 LISTEN/NOTIFY 로 받아 메모리에서 누적 집계를 유지한다.
+전체 / 라인별 / 최근 1~max_days 일 기간별 순위를 모두 정렬 리스트로 유지하므로 top-k 조회는 O(k).
+
+기간별 순위는 일자 버킷(일자 -> 라인, 유형별 건수)을 두고 날짜가 바뀔 때 기간을 벗어난 버킷만
+빼서 갱신한다. max_days 보다 오래된 버킷은 버린다. 검사 한 건 반영 비용은 O(max_days x log 유형 수).
+
+사용:
+    from common.topn import DefectTopN
+    defect_index = DefectTopN(DB_URL, TOPN_POLL_INTERVAL, TOPN_MAX_DAYS)
+    defect_index.top_if_ready(3)   # 처음 호출 시 LISTEN 스레드 시작, 준비 전이면 None
+"""
+
+import bisect
+import json
+import select
+import threading
+import time
+from collections import defaultdict
+from datetime import date
+
+
+class _Ranking:
+    """불량 유형별 건수와 (-건수, 유형) 정렬 리스트. 반영된 검사 행이 없어진 유형은 뺀다."""
+
+    def __init__(self):
+        self.counts = {}  # 유형 -> [건수, 검사 행 수]
+        self.order = []
+
+    def add(self, defect_type: str, delta: int, rows: int = 1):
+        entry = self.counts.get(defect_type)
+        if entry is not None:
+            del self.order[bisect.bisect_left(self.order, (-entry[0], defect_type))]
+        else:
+            entry = self.counts[defect_type] = [0, 0]
+        entry[0] += delta
+        entry[1] += rows
+        if entry[1] > 0:
+            bisect.insort(self.order, (-entry[0], defect_type))
+        else:
+            del self.counts[defect_type]
+
+    def top(self, k: int) -> list:
+        return [{"defect_type": t, "cnt": -c} for c, t in self.order[:k]]
+
+
+def _xid_visible(xid: int, snapshot: str) -> bool:
+    """pg_current_snapshot() 문자열(xmin:xmax:xip,...) 기준으로 트랜잭션이 보이는지"""
+    xmin, xmax, xip = snapshot.split(":")
+    if xid < int(xmin):
+        return True
+    if xid >= int(xmax):
+        return False
+    return str(xid) not in xip.split(",")
+
+
+class DefectTopN:
+    """불량 유형 Top-N 인덱스 (전체 / 라인별 / 최근 max_days 일 이내 기간별)
+
+    version 은 인덱스에 반영된 quality_inspections 의 data_version 이다. 검사 테이블을 바꾼
+    트랜잭션은 커밋 직전에 버전을 올리면서 같은 채널로 {"version": n} 을 알리므로, 인덱스가
+    어느 커밋까지 반영했는지 SQL 에서 읽은 버전과 비교할 수 있다.
+    """
+
+    def __init__(self, db_url: str, poll_interval: float = 5.0, max_days: int = 30):
+        self.db_url = db_url
+        self.poll_interval = poll_interval
+        self.max_days = max_days
+        self._lock = threading.Lock()
+        self._started = False
+        self.ready = threading.Event()
+        self._reset()
+
+    def _reset(self):
+        self.version = None
+        self._today = date.today()
+        self._overall = _Ranking()
+        self._by_line = defaultdict(_Ranking)
+        # 기간(일) -> 라인 ID(None 은 전체) -> 순위
+        self._windows = {days: defaultdict(_Ranking) for days in range(1, self.max_days + 1)}
+        # 최근 max_days 일 이내 일자 -> (라인 ID, 유형) -> [건수, 검사 행 수]
+        self._buckets = defaultdict(dict)
+
+    def _add_to_windows(self, first: int, last: int, line_id: str, defect_type: str, count: int, rows: int):
+        """기간 first~last 일 순위에 반영"""
+        for days in range(max(first, 1), min(last, self.max_days) + 1):
+            self._windows[days][None].add(defect_type, count, rows)
+            self._windows[days][line_id].add(defect_type, count, rows)
+
+    def _roll(self):
+        """날짜가 바뀌었으면 기간을 벗어난 일자 버킷을 각 기간 순위에서 빼고 오래된 버킷은 버린다"""
+        today = date.today()
+        elapsed = (today - self._today).days
+        if elapsed <= 0:
+            return
+        for bucket_date in list(self._buckets):
+            age = (self._today - bucket_date).days
+            # 기간 age+1 ~ age+elapsed 일에서 빠진다
+            for (line_id, defect_type), (count, rows) in self._buckets[bucket_date].items():
+                self._add_to_windows(age + 1, age + elapsed, line_id, defect_type, -count, -rows)
+            if age + elapsed >= self.max_days:
+                del self._buckets[bucket_date]
+        self._today = today
+
+    def _apply(self, line_id: str, production_date: str, defect_type: str, count: int, rows: int = 1):
+        self._overall.add(defect_type, count, rows)
+        self._by_line[line_id].add(defect_type, count, rows)
+        self._roll()
+        production_date = date.fromisoformat(production_date)
+        age = (self._today - production_date).days
+        if age >= self.max_days:
+            return
+        entry = self._buckets[production_date].setdefault((line_id, defect_type), [0, 0])
+        entry[0] += count
+        entry[1] += rows
+        # 미래 일자(age < 0)는 모든 기간에 포함된다
+        self._add_to_windows(age + 1, self.max_days, line_id, defect_type, count, rows)
+
+    def top(self, k: int = 3, line_id: str = None, days: int = None) -> list:
+        """상위 k 개. days 는 최근 며칠(오늘 포함)이며 1~max_days 만 지원한다."""
+        if days is not None and not 1 <= days <= self.max_days:
+            raise ValueError(f"days 는 1~{self.max_days} 사이여야 합니다")
+        with self._lock:
+            if days is None:
+                ranking = self._by_line.get(line_id) if line_id else self._overall
+            else:
+                self._roll()
+                ranking = self._windows[days].get(line_id)
+            return ranking.top(k) if ranking else []
+
+    def top_if_ready(self, k: int = 3, line_id: str = None, days: int = None) -> list:
+        """상위 k 개. 인덱스가 준비되지 않았으면 기다리지 않고 None.
+
+        호출하는 쪽이 풀 커넥션과 수용 제어 자리를 잡은 채 부르므로 여기서 대기하면 안 된다.
+        """
+        self.start()
+        if not self.ready.is_set():
+            return None
+        return self.top(k, line_id, days)
+
+    def top_at_version(self, version: int, k: int = 3) -> list:
+        """인덱스가 quality_inspections 버전 version 까지 정확히 반영했을 때만 전체 상위 k 개, 아니면 None
+
+        인덱스는 커밋 후 알림을 처리해야 갱신되므로, SQL 로 읽은 다른 데이터(ETag 버전 등)와
+        같은 시점의 결과가 필요하면 이 함수로 확인하고 None 이면 SQL 로 집계한다.
+        """
+        self.start()
+        with self._lock:
+            if not self.ready.is_set() or self.version != version:
+                return None
+            return self._overall.top(k)
+
+    def start(self):
+        """LISTEN 스레드 시작 (여러 번 호출해도 한 번만 시작)"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._run, name="defect-topn", daemon=True).start()
+
+    def _run(self):
+        import psycopg2
+        while True:
+            try:
+                conn = psycopg2.connect(self.db_url)
+                conn.autocommit = True
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute("LISTEN defect_changes")
+                    snapshot = self._load(conn)
+                    while True:
+                        if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                            continue
+                        conn.poll()
+                        while conn.notifies:
+                            event = json.loads(conn.notifies.pop(0).payload)
+                            if event.get("resync"):
+                                # 수정/삭제: 새 스냅샷으로 다시 적재 (남은 알림은 새 스냅샷 기준으로 판단)
+                                snapshot = self._load(conn)
+                                continue
+                            if "version" in event:
+                                # 트랜잭션의 마지막 알림: 그 트랜잭션의 추가가 모두 반영됨
+                                with self._lock:
+                                    self.version = max(self.version, event["version"])
+                                continue
+                            if _xid_visible(int(event["xid"]), snapshot):
+                                continue  # 이미 초기 적재에 포함된 변경
+                            with self._lock:
+                                self._apply(event["line_id"], event["production_date"],
+                                            event["defect_type"], event["defect_count"])
+                finally:
+                    conn.close()
+            except Exception:
+                # 연결이 끊기면 다시 LISTEN 하고 전체를 다시 적재
+                self.ready.clear()
+                time.sleep(self.poll_interval)
+
+    def _load(self, conn) -> str:
+        """LISTEN 이후 REPEATABLE READ 스냅샷으로 전체 집계를 적재하고 스냅샷 문자열 반환"""
+        with conn.cursor() as cur:
+            cur.execute("BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY")
+            cur.execute("SELECT pg_current_snapshot()::text")
+            snapshot = cur.fetchone()[0]
+            cur.execute("SELECT version FROM data_version WHERE table_name = 'quality_inspections'")
+            version = cur.fetchone()[0]
+            cur.execute("""
+                SELECT r.line_id, r.production_date::text, q.defect_type, SUM(q.defect_count), COUNT(*)
+                FROM quality_inspections q
+                JOIN production_records r ON q.record_id = r.record_id
+                GROUP BY r.line_id, r.production_date, q.defect_type
+            """)
+            rows = cur.fetchall()
+            cur.execute("COMMIT")
+        with self._lock:
+            self._reset()
+            for line_id, production_date, defect_type, count, inspections in rows:
+                self._apply(line_id, production_date, defect_type, int(count), inspections)
+            self.version = version
+        self.ready.set()
+        return snapshot
@@ -1,17 +1,166 @@
 from fastmcp import FastMCP
+from array import array
 import json
 import os
+import re
+import sys
+import threading
+from collections import Counter
 from datetime import datetime, timedelta
 from pathlib import Path
 
+# 서버 간 공용 모듈. 컨테이너에서는 스크립트 옆(/app/common), 저장소에서는 servers/common 에 있다.
+SERVER_DIR = Path(__file__).resolve().parent
+sys.path.append(str(SERVER_DIR if (SERVER_DIR / "common").is_dir() else SERVER_DIR.parent))
+from common.profiling import profiled, register_admin_tools
+
 # 서버 인스턴스 생성
 mcp = FastMCP("ResourceServer")
+MCP_PORT = int(os.environ.get("MCP_PORT", "8000"))
 
 # 데이터 디렉토리 경로
 DATA_DIR = Path(__file__).parent / "data"
+LOG_PATH = DATA_DIR / "logs" / "app.log"
+# 로그 지표를 보관할 기간(분). 최신 로그 시각 기준으로 이보다 오래된 분은 덮어쓴다.
+LOG_METRICS_MINUTES = int(os.environ.get("LOG_METRICS_MINUTES", "1440"))
+
+
+# ============================================================
+# 온디맨드 프로파일링 (관리자 전용, servers/common/profiling.py)
+# ============================================================
+
+register_admin_tools(mcp)
+
+
+# ============================================================
+# 로그 지표 (logs://metrics/{window})
+#   app.log 를 읽은 위치(offset)부터 이어서 파싱하여 (레벨, 컴포넌트) 별 분당 건수를 유지한다.
+#   분당 건수는 LOG_METRICS_MINUTES 칸짜리 링 버퍼(array)에 저장하고,
+#   각 칸이 어느 분의 값인지 따로 기록해 오래된 칸은 다시 쓸 때 비운다.
+#   파일이 줄어들거나 교체되면(truncate / rotate) 처음부터 다시 집계한다.
+# ============================================================
+
+LOG_LINE = re.compile(rb"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}):\d{2}\s+([A-Za-z]+)\s+(?:\[([^\]]+)\])?")
+LEVEL_ALIASES = {"WARNING": "WARN", "FATAL": "CRITICAL"}
+ERROR_LEVELS = ("ERROR", "CRITICAL")
+_EPOCH = datetime(1970, 1, 1)
+
+
+class LogMetrics:
+    """app.log 의 분당 건수를 증분 집계하는 링 버퍼"""
+
+    def __init__(self, path: Path, minutes: int):
+        self.path = path
+        self.size = minutes
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._offset = 0
+        self._file_id = None
+        self.latest = None  # 가장 최근 로그의 분 (epoch 기준 분)
+        self._slot_minute = array("q", [-1]) * self.size
+        self.series = {}  # (level, component) -> array("I") 분당 건수
+        self._minute_cache = (None, None)
+
+    def _minute(self, stamp: bytes) -> int:
+        """'YYYY-MM-DD HH:MM' -> epoch 기준 분. 같은 분의 줄이 연속되므로 직전 값을 재사용"""
+        if self._minute_cache[0] != stamp:
+            dt = datetime.strptime(stamp.decode(), "%Y-%m-%d %H:%M")
+            self._minute_cache = (stamp, (dt - _EPOCH) // timedelta(minutes=1))
+        return self._minute_cache[1]
+
+    def _add(self, minute: int, level: str, component: str):
+        if self.latest is not None and minute <= self.latest - self.size:
+            return  # 링 버퍼 범위보다 오래된 줄
+        slot = minute % self.size
+        if self._slot_minute[slot] != minute:
+            if self._slot_minute[slot] > minute:
+                return  # 더 최근 분이 이미 차지한 칸
+            for counts in self.series.values():
+                counts[slot] = 0
+            self._slot_minute[slot] = minute
+        counts = self.series.get((level, component))
+        if counts is None:
+            counts = self.series[(level, component)] = array("I", [0]) * self.size
+        counts[slot] += 1
+        if self.latest is None or minute > self.latest:
+            self.latest = minute
+
+    def refresh(self):
+        """파일에서 새로 추가된 완전한 줄만 읽어 집계에 반영"""
+        with self._lock:
+            try:
+                stat = self.path.stat()
+            except FileNotFoundError:
+                self._reset()
+                return
+            file_id = (stat.st_dev, stat.st_ino)
+            if file_id != self._file_id or stat.st_size < self._offset:
+                self._reset()
+                self._file_id = file_id
+            if stat.st_size == self._offset:
+                return
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                chunk = f.read(stat.st_size - self._offset)
+            end = chunk.rfind(b"\n") + 1  # 쓰는 중인 마지막 줄은 다음에 읽는다
+            for line in chunk[:end].splitlines():
+                m = LOG_LINE.match(line)
+                if m is None:
+                    continue  # 스택 트레이스 등 이어지는 줄
+                level = m.group(2).decode().upper()
+                level = LEVEL_ALIASES.get(level, level)
+                component = m.group(3).decode(errors="replace") if m.group(3) else "app"
+                self._add(self._minute(m.group(1)), level, component)
+            self._offset += end
+
+    def window(self, minutes: int) -> dict:
+        """최신 로그 시각 기준 최근 minutes 분의 분당 건수"""
+        self.refresh()
+        with self._lock:
+            if self.latest is None:
+                return {"minutes": 0, "series": []}
+            latest = self.latest
+            minutes = max(1, min(minutes, self.size))
+            first = latest - minutes + 1
+            slots = [(m % self.size, m) for m in range(first, latest + 1)]
+            series = []
+            for (level, component), counts in sorted(self.series.items()):
+                values = [counts[slot] if self._slot_minute[slot] == m else 0 for slot, m in slots]
+                total = sum(values)
+                if total:
+                    series.append({"level": level, "component": component, "total": total, "counts": values})
+        start = _EPOCH + timedelta(minutes=first)
+        end = _EPOCH + timedelta(minutes=latest)
+        totals = Counter()
+        for s in series:
+            totals[s["level"]] += s["total"]
+        all_lines = sum(totals.values())
+        return {
+            "start": start.strftime("%Y-%m-%d %H:%M"),
+            "end": end.strftime("%Y-%m-%d %H:%M"),
+            "step": "1m",
+            "minutes": minutes,
+            "totals": dict(totals),
+            "error_rate": round(sum(totals[l] for l in ERROR_LEVELS) / all_lines, 4) if all_lines else 0.0,
+            "series": series,
+        }
+
+
+_log_metrics = LogMetrics(LOG_PATH, LOG_METRICS_MINUTES)
+
+
+def _parse_window(window: str) -> int:
+    """'30', '30m', '6h', '1d' -> 분"""
+    m = re.fullmatch(r"(\d+)([mhd]?)", window.strip().lower())
+    if m is None:
+        raise ValueError(f"잘못된 window 입니다: {window} (예: 30m, 6h, 1d)")
+    return int(m.group(1)) * {"": 1, "m": 1, "h": 60, "d": 1440}[m.group(2)]
 
 
 @mcp.resource("config://app/settings")
+@profiled
 def get_app_settings() -> str:
     """애플리케이션 설정 정보를 반환합니다."""
     config_path = DATA_DIR / "config.json"
@@ -21,6 +170,7 @@ def get_app_settings() -> str:
 
 
 @mcp.resource("logs://app/current")
+@profiled
 def get_current_logs() -> str:
     """현재 애플리케이션 로그를 반환합니다."""
     log_path = DATA_DIR / "logs" / "app.log"
@@ -29,7 +179,19 @@ def get_current_logs() -> str:
     return "No logs available"
 
 
+@mcp.resource("logs://metrics/{window}")
+@profiled
+def get_log_metrics(window: str) -> str:
+    """최신 로그 시각 기준 최근 window(예: 30m, 6h, 1d) 동안의 레벨/컴포넌트별 분당 로그 건수를 반환합니다."""
+    try:
+        minutes = _parse_window(window)
+    except ValueError as e:
+        return json.dumps({"error": str(e)}, ensure_ascii=False)
+    return json.dumps(_log_metrics.window(minutes), ensure_ascii=False, separators=(",", ":"))
+
+
 @mcp.resource("logs://level/{level}")
+@profiled
 def get_logs_by_level(level: str) -> str:
     """특정 로그 레벨만 필터링하여 반환합니다. (동적 Resource 예시)"""
     log_path = DATA_DIR / "logs" / "app.log"
@@ -65,4 +227,4 @@ def daily_report(date: str, line_id: str) -> str:
 
 
 if __name__ == "__main__":
-    mcp.run(transport="sse", host="0.0.0.0", port=8000)
\ No newline at end of file
+    mcp.run(transport="sse", host="0.0.0.0", port=MCP_PORT)
\ No newline at end of file
@@ -1,13 +1,39 @@
-from fastmcp import FastMCP
+from fastmcp import FastMCP, Context
+import asyncio
+import hashlib
 import sys
 import os
+import time
 from datetime import datetime
+from pathlib import Path
+
+# 서버 간 공용 모듈. 컨테이너에서는 스크립트 옆(/app/common), 저장소에서는 servers/common 에 있다.
+SERVER_DIR = Path(__file__).resolve().parent
+sys.path.append(str(SERVER_DIR if (SERVER_DIR / "common").is_dir() else SERVER_DIR.parent))
+from common.profiling import profiled, register_admin_tools
 
 # MCP 서버 인스턴스 생성
 mcp = FastMCP("TestServer")
 
+# 실행 transport (sse, http, stdio). 전송 방식 벤치마크 시 변경
+MCP_TRANSPORT = os.environ.get("MCP_TRANSPORT", "sse")
+MCP_PORT = int(os.environ.get("MCP_PORT", "8000"))
+# 벤치마크 Tool 응답 크기 상한 (bytes)
+BENCH_MAX_PAYLOAD = int(os.environ.get("BENCH_MAX_PAYLOAD", str(16 * 1024 * 1024)))
+# bench_cpu 반복 횟수 상한. 동기 Tool 이라 실행 중에는 서버가 멈추므로 한 번에 쓸 수 있는 CPU 시간을 제한
+BENCH_MAX_CPU_ITERATIONS = int(os.environ.get("BENCH_MAX_CPU_ITERATIONS", "1000000"))
+
+
+# ============================================================
+# 온디맨드 프로파일링 (관리자 전용, servers/common/profiling.py)
+# ============================================================
+
+register_admin_tools(mcp)
+
+
 # 함수를 MCP 도구로 등록하는 데코레이터
 @mcp.tool
+@profiled
 def hello_mcp() -> str:
     """
     MCP 연결 테스트를 위한 간단한 도구입니다.
@@ -21,6 +47,7 @@ def hello_mcp() -> str:
 
 
 @mcp.tool
+@profiled
 def add_numbers(a: int, b: int) -> int:
     """
     두 숫자를 더합니다.
@@ -37,6 +64,7 @@ def add_numbers(a: int, b: int) -> int:
 
 
 @mcp.tool
+@profiled
 def get_system_info() -> dict:
     """
     서버의 시스템 정보를 반환합니다.
@@ -51,12 +79,13 @@ def get_system_info() -> dict:
         "working_directory": os.getcwd(),
         "environment": "docker" if os.path.exists("/.dockerenv") else "local",
         "server_name": "TestServer",
-        "transport": "HTTP (SSE)",
+        "transport": MCP_TRANSPORT,
         "status": "operational"
     }
 
 
 @mcp.tool
+@profiled
 def echo_message(message: str, uppercase: bool = False) -> str:
     """
     입력받은 메시지를 그대로 반환합니다.
@@ -73,5 +102,98 @@ def echo_message(message: str, uppercase: bool = False) -> str:
         return message.upper()
     return message
 
+
+# ============================================================
+# 벤치마크용 합성 부하 Tool (DB 없이 transport 자체 성능 측정)
+# ============================================================
+
+@mcp.tool
+@profiled
+def bench_payload(size_bytes: int = 1024) -> str:
+    """
+    지정한 크기의 문자열을 반환합니다.
+    응답 크기에 따른 전송/프레이밍 비용 측정용입니다.
+    
+    Args:
+        size_bytes: 응답 크기 (bytes, 최대 BENCH_MAX_PAYLOAD)
+    
+    Returns:
+        size_bytes 길이의 문자열
+    """
+    return "x" * max(0, min(size_bytes, BENCH_MAX_PAYLOAD))
+
+
+@mcp.tool
+@profiled
+def bench_cpu(iterations: int = 100000) -> dict:
+    """
+    SHA-256 을 반복 계산하여 CPU 부하를 만듭니다.
+    
+    Args:
+        iterations: 해시 반복 횟수 (최대 BENCH_MAX_CPU_ITERATIONS)
+    
+    Returns:
+        실제 반복 횟수, 최종 해시, 서버 측 소요 시간(ms)
+    """
+    iterations = max(0, min(iterations, BENCH_MAX_CPU_ITERATIONS))
+    start = time.perf_counter()
+    digest = b""
+    for _ in range(iterations):
+        digest = hashlib.sha256(digest).digest()
+    return {
+        "iterations": iterations,
+        "digest": digest.hex(),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)
+    }
+
+
+@mcp.tool
+@profiled
+async def bench_sleep(delay_ms: int = 100) -> dict:
+    """
+    지정한 시간만큼 대기합니다. (I/O 지연 모사, 이벤트 루프는 막지 않음)
+    
+    Args:
+        delay_ms: 대기 시간 (ms)
+    
+    Returns:
+        요청한 대기 시간과 실제 소요 시간(ms)
+    """
+    start = time.perf_counter()
+    await asyncio.sleep(delay_ms / 1000)
+    return {
+        "delay_ms": delay_ms,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)
+    }
+
+
+@mcp.tool
+@profiled
+async def bench_stream(steps: int = 10, interval_ms: int = 100, ctx: Context = None) -> dict:
+    """
+    steps 번에 걸쳐 진행 상황(progress) 알림을 보냅니다.
+    스트리밍 알림 전달 지연 측정용입니다.
+    
+    Args:
+        steps: 알림 횟수
+        interval_ms: 알림 간격 (ms)
+    
+    Returns:
+        보낸 알림 수와 서버 측 소요 시간(ms)
+    """
+    start = time.perf_counter()
+    for step in range(1, steps + 1):
+        await asyncio.sleep(interval_ms / 1000)
+        if ctx is not None:
+            await ctx.report_progress(step, steps)
+    return {
+        "steps": steps,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)
+    }
+
+
 if __name__ == "__main__":
-    mcp.run(transport="sse", host="0.0.0.0", port=8000)
\ No newline at end of file
+    if MCP_TRANSPORT == "stdio":
+        mcp.run(transport="stdio")
+    else:
+        mcp.run(transport=MCP_TRANSPORT, host="0.0.0.0", port=MCP_PORT)
\ No newline at end of file
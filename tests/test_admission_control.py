@@ -0,0 +1,57 @@
+"""수용 제어: 취소된 요청의 자리 반납 시점, REST 적용 (user-032)"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def test_slot_is_held_until_cancelled_worker_finishes(load_server):
+    server = load_server("mes-server", ADMISSION_MAX_CONCURRENT=1, ADMISSION_QUEUE_TIMEOUT=0.1)
+    finished = threading.Event()
+
+    def slow_tool(ctx=None):
+        time.sleep(0.5)
+        finished.set()
+        return "slow"
+
+    def fast_tool(ctx=None):
+        return "fast"
+
+    slow_tool = server.admission.controlled(slow_tool)
+    fast_tool = server.admission.controlled(fast_tool)
+
+    async def scenario():
+        task = asyncio.create_task(slow_tool())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        # 요청은 취소됐지만 작업 스레드가 아직 실행 중이므로 자리가 없어야 한다
+        rejected = json.loads(await fast_tool())
+        while not finished.is_set():
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        return rejected, await fast_tool()
+
+    rejected, accepted = asyncio.run(scenario())
+    assert rejected["overloaded"] is True
+    assert accepted == "fast"
+
+
+def test_rest_routes_share_admission_limit(load_server, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    main = load_server("fastapi-mcp-server", ADMISSION_MAX_CONCURRENT=1, ADMISSION_QUEUE_TIMEOUT=0.05)
+
+    def slow_products(session=None):
+        time.sleep(0.3)
+        return []
+
+    monkeypatch.setattr(main, "get_products_data", slow_products)
+    with TestClient(main.app, raise_server_exceptions=False) as client:
+        with ThreadPoolExecutor(3) as pool:
+            responses = list(pool.map(lambda _: client.get("/api/products"), range(3)))
+    assert Counter(r.status_code for r in responses) == {200: 1, 503: 2}
+    assert all("Retry-After" in r.headers for r in responses if r.status_code == 503)
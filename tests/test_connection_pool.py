@@ -0,0 +1,52 @@
+"""커넥션 풀 크기보다 많은 동시 요청 (user-026)"""
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+@pytest.mark.parametrize("server", ["mes-server", "fastapi-mcp-server"])
+def test_get_conn_waits_when_pool_is_exhausted(load_server, server):
+    module = load_server(server, DB_POOL_MAX=2)
+
+    def hold():
+        with module.db.get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_sleep(0.1)")
+        return True
+
+    with ThreadPoolExecutor(8) as pool:
+        assert all(pool.map(lambda _: hold(), range(8)))
+
+
+@pytest.mark.parametrize("server", ["mes-server", "fastapi-mcp-server"])
+def test_get_conn_raises_pool_busy_after_timeout(load_server, server):
+    module = load_server(server, DB_POOL_MAX=1, DB_POOL_TIMEOUT=0.05)
+    from common.db import PoolBusy
+    with module.db.get_conn():
+        with ThreadPoolExecutor(1) as pool:
+            future = pool.submit(lambda: module.db.get_conn().__enter__())
+            with pytest.raises(PoolBusy):
+                future.result()
+
+
+def test_rest_requests_above_pool_size(load_server):
+    from fastapi.testclient import TestClient
+
+    main = load_server("fastapi-mcp-server", DB_POOL_MAX=2)
+    with TestClient(main.app, raise_server_exceptions=False) as client:
+        with ThreadPoolExecutor(20) as pool:
+            statuses = Counter(pool.map(lambda _: client.get("/api/products").status_code, range(20)))
+    assert statuses == {200: 20}
+
+
+def test_rest_pool_busy_is_503(load_server):
+    from fastapi.testclient import TestClient
+
+    main = load_server("fastapi-mcp-server", DB_POOL_MAX=1, DB_POOL_TIMEOUT=0.05)
+    with TestClient(main.app, raise_server_exceptions=False) as client:
+        with main.db.pooled_conn():
+            response = client.get("/api/products")
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
@@ -0,0 +1,89 @@
+"""테이블별 data_version 과 ETag (user-029)"""
+
+import time
+import uuid
+
+import pytest
+
+
+def versions(db):
+    with db.cursor() as cur:
+        cur.execute("SELECT table_name, version FROM data_version")
+        return dict(cur.fetchall())
+
+
+@pytest.fixture
+def keys(db):
+    """테스트가 넣은 생산 실적의 ingest_key (끝나면 삭제)"""
+    keys = []
+    yield keys
+    with db.cursor() as cur:
+        cur.execute("DELETE FROM production_records WHERE ingest_key = ANY(%s)", (keys,))
+
+
+def insert_record(cur, keys):
+    key = uuid.uuid4().hex
+    keys.append(key)
+    cur.execute("""
+        INSERT INTO production_records (ingest_key, line_id, product_id, target_qty, produced_qty)
+        VALUES (%s, 'LINE-01', 'PROD-A', 10, 10)
+    """, (key,))
+
+
+def test_concurrent_writers_do_not_wait_for_each_other(db_url, db, keys):
+    import psycopg2
+
+    before = versions(db)
+    first = psycopg2.connect(db_url)
+    second = psycopg2.connect(db_url)
+    try:
+        with first.cursor() as cur:
+            insert_record(cur, keys)  # 커밋하지 않은 채 열어 둔다
+        with second.cursor() as cur:
+            cur.execute("SET lock_timeout = '1s'")
+            start = time.monotonic()
+            insert_record(cur, keys)
+        second.commit()
+        assert time.monotonic() - start < 0.5
+        first.commit()
+    finally:
+        first.close()
+        second.close()
+
+    after = versions(db)
+    assert after["production_records"] == before["production_records"] + 2
+    assert after["quality_inspections"] == before["quality_inspections"]
+
+
+def test_version_bumped_once_per_transaction_and_not_on_rollback(db, keys):
+    before = versions(db)
+    with db.cursor() as cur:
+        cur.execute("BEGIN")
+        for _ in range(3):
+            insert_record(cur, keys)
+        cur.execute("COMMIT")
+    assert versions(db)["production_records"] == before["production_records"] + 1
+
+    with db.cursor() as cur:
+        cur.execute("BEGIN")
+        insert_record(cur, keys)
+        cur.execute("ROLLBACK")
+    assert versions(db)["production_records"] == before["production_records"] + 1
+
+
+def test_etag_only_changes_with_the_tables_a_route_reads(load_server, db, keys):
+    from fastapi.testclient import TestClient
+
+    main = load_server("fastapi-mcp-server")
+    with TestClient(main.app) as client:
+        lines = client.get("/api/lines")
+        dashboard = client.get("/api/dashboard")
+        with db.cursor() as cur:
+            insert_record(cur, keys)
+
+        # 실적만 바뀌었으므로 라인 목록은 304, 대시보드는 새 응답
+        response = client.get("/api/lines", headers={"If-None-Match": lines.headers["ETag"]})
+        assert response.status_code == 304
+        response = client.get("/api/dashboard", headers={"If-None-Match": dashboard.headers["ETag"]})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != dashboard.headers["ETag"]
@@ -0,0 +1,203 @@
+"""불량 Top-N 인덱스와 SQL 집계 결과 비교 (user-030)"""
+
+import asyncio
+import json
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+
+import pytest
+
+from conftest import SERVERS_DIR
+
+sys.path.append(str(SERVERS_DIR))
+from common import topn  # noqa: E402
+
+# 인덱스와 같은 순서 (건수 내림차순, 유형 코드포인트 순)
+SQL_TOP = """
+    SELECT q.defect_type, SUM(q.defect_count) as cnt
+    FROM quality_inspections q
+    JOIN production_records r ON q.record_id = r.record_id
+    WHERE (%(line_id)s::varchar IS NULL OR r.line_id = %(line_id)s)
+      AND (%(since)s::date IS NULL OR r.production_date >= %(since)s)
+    GROUP BY q.defect_type
+    ORDER BY cnt DESC, q.defect_type COLLATE "C"
+    LIMIT %(k)s
+"""
+
+CASES = [
+    (3, None, None),
+    (10, None, None),
+    (2, "LINE-01", None),
+    (10, "LINE-02", None),
+    (10, None, 7),
+    (1, "LINE-01", 7),
+    (10, "LINE-03", 1),
+    (10, None, 30),
+]
+
+
+def sql_top(db, k, line_id=None, days=None):
+    since = date.today() - timedelta(days=days - 1) if days else None
+    with db.cursor() as cur:
+        cur.execute(SQL_TOP, {"k": k, "line_id": line_id, "since": since})
+        return [{"defect_type": t, "cnt": int(c)} for t, c in cur.fetchall()]
+
+
+def dashboard_top(module):
+    with module.db.get_conn() as conn:
+        with module.dict_cursor(conn) as cur:
+            module.db.execute(cur, "dashboard_top_defects")
+            return [{"defect_type": r["defect_type"], "cnt": int(r["cnt"])} for r in cur.fetchall()]
+
+
+def wait_until(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return predicate()
+
+
+@pytest.fixture
+def records(db):
+    """테스트용 생산 실적: 키 -> record_id (오늘 / 3일 전 / 30일 전)"""
+    prefix = uuid.uuid4().hex[:16]
+    specs = {
+        "l1_today": ("LINE-01", 0), "l2_today": ("LINE-02", 0),
+        "l1_recent": ("LINE-01", 3), "l3_old": ("LINE-03", 30),
+    }
+    ids = {}
+    with db.cursor() as cur:
+        for name, (line_id, days_ago) in specs.items():
+            cur.execute("""
+                INSERT INTO production_records
+                (ingest_key, line_id, product_id, production_date, target_qty, produced_qty)
+                VALUES (%s, %s, 'PROD-A', %s, 1000, 1000) RETURNING record_id
+            """, (f"{prefix}-{name}", line_id, date.today() - timedelta(days=days_ago)))
+            ids[name] = cur.fetchone()[0]
+    yield ids
+    with db.cursor() as cur:
+        cur.execute("DELETE FROM quality_inspections WHERE record_id = ANY(%s)", (list(ids.values()),))
+        cur.execute("DELETE FROM production_records WHERE record_id = ANY(%s)", (list(ids.values()),))
+
+
+@pytest.mark.parametrize("server", ["mes-server", "fastapi-mcp-server"])
+def test_index_matches_sql_after_mixed_changes(load_server, db, records, server):
+    module = load_server(server, TOPN_POLL_INTERVAL=0.1)
+    index = module.defect_index
+    index.start()
+    assert index.ready.wait(10), "Top-N 인덱스가 준비되지 않았습니다"
+
+    def insert(rows):
+        with db.cursor() as cur:
+            cur.execute("BEGIN")
+            for record, defect_type, count in rows:
+                cur.execute(
+                    "INSERT INTO quality_inspections (record_id, defect_type, defect_count) VALUES (%s, %s, %s)",
+                    (records[record], defect_type, count),
+                )
+            cur.execute("COMMIT")
+
+    # 여러 트랜잭션에 걸친 추가 (기존 유형 + 새 유형, 동점 포함)
+    insert([("l1_today", "스크래치", 40), ("l2_today", "test-dent", 25)])
+    insert([("l1_recent", "test-dent", 15), ("l3_old", "test-crack", 40), ("l3_old", "Test-Crack", 40)])
+    insert([("l2_today", "스크래치", 1), ("l1_today", "test-crack", 2)])
+    # 한 트랜잭션 안의 같은 내용 검사 (알림이 합쳐지면 안 된다)
+    insert([("l2_today", "test-dup", 7), ("l2_today", "test-dup", 7)])
+    # 롤백된 추가는 반영되면 안 된다
+    with db.cursor() as cur:
+        cur.execute("BEGIN")
+        cur.execute("INSERT INTO quality_inspections (record_id, defect_type, defect_count) VALUES (%s, 'test-rollback', 999)",
+                    (records["l1_today"],))
+        cur.execute("ROLLBACK")
+    # 수정 / 삭제는 전체 재적재로 반영
+    with db.cursor() as cur:
+        cur.execute("UPDATE quality_inspections SET defect_count = 5 WHERE record_id = %s AND defect_type = 'test-dent'",
+                    (records["l2_today"],))
+        cur.execute("DELETE FROM quality_inspections WHERE record_id = %s AND defect_type = 'test-crack'",
+                    (records["l1_today"],))
+    insert([("l1_recent", "test-dent", 3)])
+
+    def matches():
+        return all(index.top(k, line_id, days) == sql_top(db, k, line_id, days) for k, line_id, days in CASES)
+
+    assert wait_until(matches), [
+        (case, index.top(*case), sql_top(db, *case)) for case in CASES if index.top(*case) != sql_top(db, *case)
+    ]
+    assert index.top(3) == dashboard_top(module)
+    assert index.top_if_ready(3) == dashboard_top(module)
+    with db.cursor() as cur:
+        cur.execute("SELECT version FROM data_version WHERE table_name = 'quality_inspections'")
+        version = cur.fetchone()[0]
+    assert wait_until(lambda: index.version == version)
+    assert index.top_at_version(version) == dashboard_top(module)
+
+
+def test_top_defects_does_not_block_before_index_is_ready(load_server, monkeypatch):
+    module = load_server("mes-server")
+    index = module.DefectTopN(module.DB_URL)
+    monkeypatch.setattr(index, "start", lambda: None)  # LISTEN 스레드 없이 준비되지 않은 인덱스
+    start = time.monotonic()
+    assert index.top_if_ready(3) is None
+    assert time.monotonic() - start < 0.1
+
+
+def test_dashboard_uses_index_only_at_the_same_version(load_server, monkeypatch):
+    module = load_server("mes-server")
+    index = module.DefectTopN(module.DB_URL)
+    monkeypatch.setattr(index, "start", lambda: None)
+    monkeypatch.setattr(module, "defect_index", index)
+    index._apply("LINE-01", date.today().isoformat(), "index-only", 10**9)
+    index.ready.set()
+    with module.db.get_conn() as conn:
+        with module.dict_cursor(conn) as cur:
+            module.db.execute(cur, "table_version", ("quality_inspections",))
+            version = cur.fetchone()["version"]
+
+    # 인덱스가 아직 최신 커밋을 반영하지 못했으면 SQL 결과
+    index.version = version - 1
+    assert json.loads(asyncio.run(module.get_dashboard()))["top_defects"] == dashboard_top(module)
+    index.version = version
+    assert json.loads(asyncio.run(module.get_dashboard()))["top_defects"][0] == {"defect_type": "index-only", "cnt": 10**9}
+
+
+def test_windows_roll_over_and_evict_old_days(monkeypatch):
+    class Today(date):
+        current = date(2026, 3, 10)
+
+        @classmethod
+        def today(cls):
+            return cls.current
+
+    monkeypatch.setattr(topn, "date", Today)
+    index = topn.DefectTopN("", max_days=7)
+    index._apply("LINE-01", "2026-03-10", "a", 5)
+    index._apply("LINE-02", "2026-03-08", "b", 4)
+    index._apply("LINE-01", "2026-03-04", "c", 3)
+    index._apply("LINE-01", "2026-03-03", "old", 9)  # 7일 밖: 전체 순위에만
+    index._apply("LINE-01", "2026-03-12", "future", 1)
+
+    def window(days, line_id=None):
+        return {row["defect_type"]: row["cnt"] for row in index.top(10, line_id, days)}
+
+    assert window(1) == {"a": 5, "future": 1}
+    assert window(3) == {"a": 5, "b": 4, "future": 1}
+    assert window(7) == {"a": 5, "b": 4, "c": 3, "future": 1}
+    assert window(7, "LINE-01") == {"a": 5, "c": 3, "future": 1}
+
+    Today.current = date(2026, 3, 12)
+    assert window(1) == {"future": 1}
+    assert window(3) == {"a": 5, "future": 1}
+    assert window(7) == {"a": 5, "b": 4, "future": 1}
+    assert window(7, "LINE-02") == {"b": 4}
+    assert sorted(index._buckets) == [date(2026, 3, 8), date(2026, 3, 10), date(2026, 3, 12)]
+
+    Today.current = date(2026, 4, 1)
+    assert window(7) == {}
+    assert not index._buckets
+    assert index.top(1) == [{"defect_type": "old", "cnt": 9}]
+    with pytest.raises(ValueError):
+        index.top(3, days=8)
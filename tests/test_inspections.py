@@ -0,0 +1,63 @@
+"""품질 검사 일괄 등록과 defect_qty 반영 (user-038)"""
+
+import pytest
+
+SERVERS = {
+    # 서버 이름 -> (등록 함수 이름, 생산 수량 초과 시 예외)
+    "mes-server": ("insert_inspections", ValueError),
+    "fastapi-mcp-server": ("add_inspections_data", None),
+}
+
+
+@pytest.fixture
+def record(db):
+    """검사 외 불량 5건이 이미 있는 생산 실적 (생산 100)"""
+    with db.cursor() as cur:
+        cur.execute("""
+            INSERT INTO production_records (line_id, product_id, target_qty, produced_qty, defect_qty)
+            VALUES ('LINE-01', 'PROD-A', 100, 100, 5)
+            RETURNING record_id
+        """)
+        record_id = cur.fetchone()[0]
+    yield record_id
+    with db.cursor() as cur:
+        cur.execute("DELETE FROM quality_inspections WHERE record_id = %s", (record_id,))
+        cur.execute("DELETE FROM production_records WHERE record_id = %s", (record_id,))
+
+
+def _state(db, record_id):
+    with db.cursor() as cur:
+        cur.execute("SELECT defect_qty FROM production_records WHERE record_id = %s", (record_id,))
+        defect_qty = cur.fetchone()[0]
+        cur.execute("SELECT COALESCE(SUM(defect_count), 0) FROM quality_inspections WHERE record_id = %s",
+                    (record_id,))
+        return defect_qty, cur.fetchone()[0]
+
+
+@pytest.mark.parametrize("server", SERVERS)
+def test_inspections_add_to_existing_defect_qty(load_server, db, record, server):
+    module = load_server(server)
+    add = getattr(module, SERVERS[server][0])
+
+    result = add([
+        {"record_id": record, "defect_type": "스크래치", "defect_count": 3},
+        {"record_id": record, "defect_type": "찍힘", "defect_count": 2},
+    ])
+    assert result["inserted"] == 2
+    assert [dict(row) for row in result["defect_qty_updated"]] == [{"record_id": record, "defect_qty": 10}]
+    assert _state(db, record) == (10, 5)
+
+    add([{"record_id": record, "defect_type": "스크래치", "defect_count": 4}])
+    assert _state(db, record) == (14, 9)
+
+
+@pytest.mark.parametrize("server", SERVERS)
+def test_inspections_rejected_when_defects_exceed_produced(load_server, db, record, server):
+    module = load_server(server)
+    name, error = SERVERS[server]
+    error = error or module.HTTPException
+
+    # 검사 불량(96)만으로는 생산 수량 이내지만 기존 불량 5건을 더하면 넘는다
+    with pytest.raises(error):
+        getattr(module, name)([{"record_id": record, "defect_type": "스크래치", "defect_count": 96}])
+    assert _state(db, record) == (5, 0)
@@ -0,0 +1,58 @@
+"""fastapi-mcp-server 중첩 get_conn 재사용 규칙 (user-029)"""
+
+import pytest
+
+
+@pytest.fixture
+def main(load_server):
+    return load_server("fastapi-mcp-server")
+
+
+def test_matching_nested_call_reuses_outer_connection(main):
+    with main.db.get_conn(readonly=True, session="s1", isolation="REPEATABLE READ READ ONLY") as outer:
+        with main.db.get_conn(readonly=True, session="s1") as inner:
+            assert inner is outer
+        with main.db.get_conn(readonly=True, session="s1", isolation="REPEATABLE READ READ ONLY") as inner:
+            assert inner is outer
+
+
+def test_read_inside_write_transaction_is_allowed(main):
+    with main.db.get_conn() as outer:
+        with main.db.get_conn(readonly=True, session="other") as inner:
+            assert inner is outer
+
+
+def test_write_inside_readonly_transaction_raises(main):
+    with main.db.get_conn(readonly=True):
+        with pytest.raises(RuntimeError):
+            with main.db.get_conn():
+                pass
+
+
+def test_different_isolation_raises(main):
+    with main.db.get_conn(readonly=True):
+        with pytest.raises(RuntimeError):
+            with main.db.get_conn(readonly=True, isolation="REPEATABLE READ READ ONLY"):
+                pass
+
+
+def test_other_session_on_replica_raises(main, monkeypatch):
+    # replica 로 라우팅된 것으로 기록하되 실제 커넥션은 primary 에서 빌린다
+    pooled_conn = main.db.pooled_conn
+    monkeypatch.setattr(main.db, "_route", lambda readonly, session=None: "postgresql://replica.invalid/mes")
+    monkeypatch.setattr(main.db, "pooled_conn", lambda url: pooled_conn(main.DB_URL))
+    with main.db.get_conn(readonly=True, session="s1"):
+        with main.db.get_conn(readonly=True, session="s1"):
+            pass
+        with pytest.raises(RuntimeError):
+            with main.db.get_conn(readonly=True, session="s2"):
+                pass
+
+
+def test_run_batch_with_snapshot_tools(main):
+    results = main.run_batch_data([
+        {"tool": "get_lines"},
+        {"tool": "get_kpis"},
+        {"tool": "get_record_inspections", "args": {"record_id": 1}},
+    ])
+    assert [r.get("error") for r in results] == [None, None, None]
@@ -0,0 +1,75 @@
+"""생산 실적 가동 시간 입력과 OEE 가용률 (user-037)"""
+
+import asyncio
+import json
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def line_id(db):
+    """다른 테스트/시드 데이터와 섞이지 않도록 전용 라인 생성"""
+    line_id = f"T-{uuid.uuid4().hex[:8]}"
+    with db.cursor() as cur:
+        cur.execute("INSERT INTO production_lines (line_id, line_name) VALUES (%s, '테스트 라인')", (line_id,))
+    yield line_id
+    with db.cursor() as cur:
+        cur.execute("DELETE FROM production_records WHERE line_id = %s", (line_id,))
+        cur.execute("DELETE FROM production_lines WHERE line_id = %s", (line_id,))
+
+
+def _minutes(db, line_id):
+    with db.cursor() as cur:
+        cur.execute("""
+            SELECT planned_minutes, run_minutes FROM production_records
+            WHERE line_id = %s ORDER BY record_id
+        """, (line_id,))
+        return cur.fetchall()
+
+
+def test_rest_production_runtime_drives_availability(load_server, db, line_id):
+    from fastapi.testclient import TestClient
+
+    main = load_server("fastapi-mcp-server")
+    with TestClient(main.app) as client:
+        response = client.post("/api/production", json={
+            "line_id": line_id, "product_id": "PROD-A", "target_qty": 100, "produced_qty": 60,
+            "planned_minutes": 480, "run_minutes": 360,
+        })
+        assert response.status_code == 200
+        kpis = client.get("/api/kpi", params={"line_id": line_id}).json()
+
+    assert _minutes(db, line_id) == [(480, 360)]
+    (group,) = kpis["groups"]
+    assert group["availability_measured"] is True
+    assert group["availability"] == 0.75
+    assert group["performance"] == 0.8
+    assert group["oee"] == 0.6
+
+
+def test_mes_add_production_stores_runtime(load_server, db, line_id):
+    server = load_server("mes-server")
+    result = json.loads(asyncio.run(server.add_production(
+        line_id, "PROD-A", 100, 90, planned_minutes=480, run_minutes=450)))
+    assert result["success"] is True
+    asyncio.run(server.add_production(line_id, "PROD-A", 100, 90))
+    assert _minutes(db, line_id) == [(480, 450), (None, None)]
+
+
+@pytest.mark.parametrize("server", ["mes-server", "fastapi-mcp-server"])
+def test_journal_replays_rows_written_before_runtime_fields(load_server, db, line_id, tmp_path, server):
+    module = load_server(server)
+    # flusher 가 끼어들지 않도록 주기를 길게 두고 직접 _flush_once 를 호출한다
+    journal = module.IngestJournal(tmp_path / "ingest_journal.db", module.db, flush_interval=3600)
+    journal._open()
+    # 가동 시간 필드 추가 이전 형식(5개 필드)으로 남아 있던 저널 행
+    journal._db.execute(
+        "INSERT INTO journal (ingest_key, payload) VALUES (?, ?)",
+        (uuid.uuid4().hex, json.dumps([line_id, "PROD-A", 100, 80, 0]))
+    )
+    journal.pending += 1
+    journal.append((line_id, "PROD-A", 100, 70, 0, 480, 420))
+    journal._flush_once()
+    assert journal.pending == 0
+    assert _minutes(db, line_id) == [(None, None), (480, 420)]
@@ -0,0 +1,107 @@
+"""온디맨드 프로파일링: 겹치는 memory 프로파일링, 저장 실패 (user-034)"""
+
+import asyncio
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import SERVERS_DIR
+
+sys.path.append(str(SERVERS_DIR))
+from common import profiling  # noqa: E402
+
+
+@pytest.fixture
+def admin(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path / "profiles")
+    return tmp_path / "profiles"
+
+
+def test_overlapping_memory_profiles(admin):
+    # first 가 먼저 끝나도(tracemalloc 을 켠 쪽) second 의 스냅샷은 성공해야 한다
+    second_entered = threading.Event()
+    first_done = threading.Event()
+
+    @profiling.profiled
+    def first():
+        assert second_entered.wait(5)
+        return "first"
+
+    @profiling.profiled
+    def second():
+        second_entered.set()
+        assert first_done.wait(5)
+        return "second"
+
+    for target in ("first", "second"):
+        profiling.request_profile("secret", target, memory=True)
+    with ThreadPoolExecutor(2) as pool:
+        a = pool.submit(first)
+        b = pool.submit(second)
+        assert a.result(5) == "first"
+        first_done.set()
+        assert b.result(5) == "second"
+
+    names = sorted(path.name for path in admin.iterdir())
+    assert sum(name.endswith(".tracemalloc") for name in names) == 2
+    assert not tracemalloc.is_tracing()
+
+
+def test_profiler_failure_does_not_change_result(admin, monkeypatch):
+    admin.parent.mkdir(exist_ok=True)
+    admin.write_text("디렉터리가 아닌 파일")  # 결과 저장(mkdir) 실패
+
+    @profiling.profiled
+    def tool():
+        return 42
+
+    profiling.request_profile("secret", "tool", memory=True)
+    assert tool() == 42
+    assert not tracemalloc.is_tracing()
+
+
+def _spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def _target_work():
+    _spin(0.01)
+
+
+def _other_work():
+    _spin(0.01)
+
+
+def test_coroutine_profile_only_samples_the_target(admin, monkeypatch):
+    # await 동안 실행되는 다른 코루틴은 프로파일에 들어가면 안 된다 (cprofile 을 요청해도 샘플러 사용)
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_INTERVAL", 0.001)
+
+    @profiling.profiled
+    async def target():
+        for _ in range(20):
+            _target_work()
+            await asyncio.sleep(0)
+
+    async def other():
+        for _ in range(20):
+            _other_work()
+            await asyncio.sleep(0)
+
+    async def scenario():
+        await asyncio.gather(target(), other())
+
+    profiling.request_profile("secret", "target", mode="cprofile")
+    asyncio.run(scenario())
+
+    (path,) = admin.iterdir()
+    assert path.suffix == ".folded"
+    folded = path.read_text(encoding="utf-8")
+    assert "_target_work" in folded
+    assert "_other_work" not in folded
@@ -0,0 +1,32 @@
+"""커밋 후 read-your-writes LSN 기록 실패 (user-027)"""
+
+import uuid
+
+import pytest
+
+
+@pytest.mark.parametrize("server", ["mes-server", "fastapi-mcp-server"])
+def test_lsn_lookup_failure_does_not_fail_committed_write(load_server, db, monkeypatch, server):
+    module = load_server(server)
+    import common.db
+    monkeypatch.setattr(module.db, "replica_urls", ["postgresql://replica.invalid/mes"])
+
+    def broken_lsn(value):
+        raise RuntimeError("LSN 조회 실패")
+
+    monkeypatch.setattr(common.db, "_lsn", broken_lsn)
+    key = uuid.uuid4().hex
+    try:
+        with module.db.get_conn(session="s1") as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO production_records (ingest_key, line_id, product_id, target_qty, produced_qty)
+                    VALUES (%s, 'LINE-01', 'PROD-A', 10, 10)
+                """, (key,))
+        with db.cursor() as cur:
+            cur.execute("SELECT COUNT(*) FROM production_records WHERE ingest_key = %s", (key,))
+            assert cur.fetchone()[0] == 1
+        assert "s1" not in module.db._session_lsn
+    finally:
+        with db.cursor() as cur:
+            cur.execute("DELETE FROM production_records WHERE ingest_key = %s", (key,))
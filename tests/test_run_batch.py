@@ -0,0 +1,58 @@
+"""mes-server run_batch (user-031)"""
+
+import asyncio
+import json
+
+import pytest
+
+
+@pytest.fixture
+def server(load_server):
+    return load_server("mes-server")
+
+
+def run_batch(server, calls):
+    return json.loads(asyncio.run(server.run_batch(calls=calls)))
+
+
+def test_unknown_tool_is_reported_without_running_anything(server):
+    assert run_batch(server, [{"tool": "drop_everything"}]) == [
+        {"tool": "drop_everything", "error": "배치로 실행할 수 없는 Tool 입니다: drop_everything"}
+    ]
+
+
+def test_key_error_inside_tool_is_not_reported_as_unknown_tool(server, monkeypatch):
+    def broken(session=None):
+        raise KeyError("missing_column")
+
+    monkeypatch.setitem(server.BATCH_TOOLS, "get_products", broken)
+    result = run_batch(server, [{"tool": "get_products"}, {"tool": "get_lines"}])
+    assert result[0] == {"tool": "get_products", "error": "'missing_column'"}
+    assert "result" in result[1]
+
+
+def test_record_inspections_has_same_shape_as_standalone_tool(server):
+    standalone = json.loads(asyncio.run(server.get_record_inspections(record_id=1)))
+    batched = run_batch(server, [{"tool": "get_record_inspections", "args": {"record_id": 1}}])
+    assert batched == [{"tool": "get_record_inspections", "result": standalone}]
+    assert set(standalone) == {"record", "inspections"}
+
+
+def test_missing_record_error_matches_standalone_tool(server):
+    standalone = json.loads(asyncio.run(server.get_record_inspections(record_id=-1)))
+    batched = run_batch(server, [{"tool": "get_record_inspections", "args": {"record_id": -1}}])
+    assert batched == [{"tool": "get_record_inspections", "error": standalone["error"]}]
+
+
+@pytest.mark.parametrize("tool", [
+    "get_lines", "get_products", "get_daily_production", "get_production_summary",
+    "get_defects", "get_top_defects", "get_dashboard",
+])
+def test_batch_tools_match_standalone_tools(server, tool):
+    # 배치는 단독 Tool 과 같은 공통 조회 함수를 쓰므로 결과(또는 오류)가 같아야 한다
+    standalone = json.loads(asyncio.run(getattr(server, tool)()))
+    batched = run_batch(server, [{"tool": tool}])[0]
+    if isinstance(standalone, dict) and set(standalone) == {"error"}:
+        assert batched == {"tool": tool, "error": standalone["error"]}
+    else:
+        assert batched == {"tool": tool, "result": standalone}